@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Study Planner benchmarks
+Times the load, write, toggle, progress, parser and render hot paths on
+synthetic schedules and stores the results as JSON for comparison.
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import date, datetime, timedelta
+
+DEFAULT_PLANNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plannerV1.8.py")
+DEFAULT_SIZES = [10, 1000, 100000]
+SUBJECTS = ["Electronics 2", "Control Systems", "Circuits", "Mathematics",
+            "Digital Logic", "English", "Diff. Equations", "Electrical Machines"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def load_planner(path):
+    """Import a planner script whose file name is not a valid module name"""
+    # The planner imports its sibling modules such as study_tasks
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    spec = importlib.util.spec_from_file_location("study_planner", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StubWidget:
+    """Stands in for any Tk widget; records nothing and returns neutral values"""
+    ids = itertools.count(1)
+
+    def __init__(self, *args, **kwargs):
+        self.options = {}
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def create_window(self, *args, **kwargs):
+        return next(self.ids)
+
+    create_text = create_window
+
+    def canvasy(self, y):
+        return float(y)
+
+    def winfo_height(self):
+        return 600
+
+    def winfo_width(self):
+        return 450
+
+
+def stub_tk():
+    """Minimal tkinter namespace for rendering without a display"""
+    return types.SimpleNamespace(Frame=StubWidget, Label=StubWidget, Canvas=StubWidget)
+
+
+def synthetic_schedule(size):
+    """Weekday template with size tasks spread over the week"""
+    schedule = {day: [] for day in WEEKDAYS}
+    for i in range(size):
+        start = i % 24
+        schedule[WEEKDAYS[i % 7]].append({
+            "time": f"{start:02d}:00-{(start + 1) % 24:02d}:00",
+            "subject": SUBJECTS[i % len(SUBJECTS)],
+            "duration": "1.5h" if i % 3 else "45m",
+            "completed": i % 5 == 0,
+        })
+    return schedule
+
+
+def make_gui_planner(planner, home_dir, real_tk):
+    """Build a StudyPlanner with its data layer but without running setup_gui"""
+    gui = planner.StudyPlanner.__new__(planner.StudyPlanner)
+    planner.PlannerCore.__init__(gui, home_dir=home_dir, background_writes=False)
+    gui.current_day = date.today()
+    gui.day_tasks = []
+    gui.task_widgets = {}
+    gui.row_pool = []
+    gui.persist_job = None
+    gui.sync = None
+
+    if real_tk:
+        planner.import_tk()
+        gui.root = planner.tk.Tk()
+        gui.root.withdraw()
+        gui.canvas = planner.tk.Canvas(gui.root, width=450, height=600)
+        gui.canvas.pack()
+        gui.progress_label = planner.tk.Label(gui.root)
+        gui.progress = planner.ttk.Progressbar(gui.root)
+        gui.root.update_idletasks()
+    else:
+        planner.tk = stub_tk()
+        gui.root = gui.canvas = gui.progress_label = gui.progress = StubWidget()
+    gui.scrollbar = StubWidget()
+    gui.empty_label_id = gui.canvas.create_text(0, 0, text="")
+    return gui
+
+
+def measure(func, repeat):
+    """Best wall time of repeat runs, then the tracemalloc peak of one more run"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_size(planner, size, repeat, real_tk):
+    """Run every benchmark on one schedule size"""
+    import study_tasks  # importable once load_planner has put the planner directory on sys.path
+    home_dir = tempfile.mkdtemp(prefix="planner-bench-")
+    results = []
+    try:
+        schedule_file = os.path.join(home_dir, ".study_planner_schedule.json")
+        with open(schedule_file, "w") as f:
+            json.dump(synthetic_schedule(size), f)
+
+        gui = make_gui_planner(planner, home_dir, real_tk)
+        today = gui.current_day
+        lines = [study_tasks.format_task_line(task)
+                 for tasks in gui.schedule.values() for task in tasks]
+        toggles = itertools.count()
+
+        def toggle():
+            if gui.day_tasks:
+                gui.toggle_task(next(toggles) % len(gui.day_tasks))
+
+        def render():
+            # Start from an empty view each run, otherwise reconciling finds nothing to do
+            for index in list(gui.task_widgets):
+                gui.release_task_widget(index)
+            gui.day_tasks = []
+            gui.update_tasks_display(today)
+
+        # Write path without widget work: journal append, snapshot compaction, store commits
+        day_name = today.strftime("%A")
+        template_record = {"op": "day", "day": day_name,
+                           "tasks": [task.to_dict() for task in gui.schedule[day_name]]}
+        stored = gui.store.tasks_on(today)
+        flips = itertools.cycle([True, False])
+
+        def compact():
+            # Rotate the journal like start_compaction, then fold it in on this thread
+            gui.append_journal([template_record])
+            os.replace(gui.journal_file, gui.journal_file + ".old")
+            gui.compact_journal()
+
+        def commit_toggle():
+            if stored:
+                gui.store.set_completed(today, 0, next(flips))
+
+        def navigate():
+            # One step forward and back again, as with the day navigator
+            gui.update_tasks_display(today + timedelta(days=1))
+            gui.update_tasks_display(today)
+
+        benchmarks = [
+            ("load_schedule", gui.load_schedule),
+            ("update_tasks_display", render),
+            ("navigate_day", navigate),
+            ("toggle_task", toggle),
+            ("append_journal", lambda: gui.append_journal([template_record])),
+            ("compact_journal", compact),
+            ("store.replace_day", lambda: gui.store.replace_day(today, stored)),
+            ("store.set_completed", commit_toggle),
+            ("update_progress", lambda: gui.update_progress(today)),
+            ("edit_tasks parser", lambda: sum(1 for _ in study_tasks.iter_task_lines(lines))),
+        ]
+        for name, func in benchmarks:
+            seconds, peak = measure(func, repeat)
+            results.append({"name": name, "size": size, "seconds": seconds,
+                            "peak_kb": peak // 1024})
+            print(f"{name:<22} {size:>9} tasks {seconds * 1000:10.2f} ms {peak // 1024:>9} KiB")
+
+        gui.close()
+        if real_tk:
+            gui.root.destroy()
+    finally:
+        shutil.rmtree(home_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline_path):
+    """Print the time ratio against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        old = baseline.get((result["name"], result["size"]))
+        if old and old["seconds"] > 0:
+            ratio = result["seconds"] / old["seconds"]
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            print(f"{result['name']:<22} {result['size']:>9} tasks {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Study Planner hot paths")
+    parser.add_argument("--planner", default=DEFAULT_PLANNER, help="planner script to benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="task counts to generate (up to 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--output", help="results file, default bench-<version>-<time>.json")
+    parser.add_argument("--compare", metavar="RESULTS", help="earlier results file to compare with")
+    parser.add_argument("--real-tk", action="store_true",
+                        help="render with real Tk (needs a display, e.g. under xvfb-run)")
+    args = parser.parse_args()
+
+    planner = load_planner(args.planner)
+    match = re.search(r"V([\d.]+)\.py$", os.path.basename(args.planner))
+    version = match.group(1) if match else "unknown"
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(planner, size, args.repeat, args.real_tk))
+
+    output = args.output or f"bench-{version}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump({"planner_version": version, "python": platform.python_version(),
+                   "platform": platform.platform(), "timestamp": datetime.now().isoformat(),
+                   "real_tk": args.real_tk, "results": results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,153 @@ Pop!_OS Study Planner - Stable Minimal Version
 Improved with stable display and better UI
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox
+import time
+
+# Taken before the remaining imports so --profile-startup can account for them
+STARTUP_TIME = time.perf_counter()
+
+import argparse
+import collections
+import contextlib
+import csv
+import fcntl
+import functools
+import getpass
+import hashlib
+import heapq
+import itertools
 import json
+import marshal
+import math
 import os
-import time
-from datetime import datetime
+import queue
+import re
+import shutil
+import socket
+import signal
+import socketserver
+import stat
+import sys
+import tempfile
+import sqlite3
+import subprocess
+import threading
+from datetime import datetime, date, timedelta, timezone
+
+from study_tasks import (TASK_DURATION_RE, TASK_TIME_RE, Task, TaskLineError,
+                         format_task_line, iter_task_lines, iter_tasks_file,
+                         parse_duration_minutes, parse_task_line, parse_time_range)
+
+# tkinter is imported on first GUI use so headless runs never load it
+tk = ttk = messagebox = None
+
+def import_tk():
+    """Import tkinter modules into the module namespace"""
+    global tk, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import ttk as tkinter_ttk
+        tk, ttk = tkinter, tkinter_ttk
+
+def import_messagebox():
+    """Import tkinter.messagebox the first time a dialog is shown"""
+    global messagebox
+    if messagebox is None:
+        from tkinter import messagebox as tkinter_messagebox
+        messagebox = tkinter_messagebox
+    return messagebox
+
+class StartupProfiler:
+    """Wall-clock breakdown of startup phases for --profile-startup"""
+    
+    def __init__(self, start=STARTUP_TIME):
+        self.start = start
+        self.last = start
+        self.phases = []
+    
+    def mark(self, phase):
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def report(self):
+        """Print the phase breakdown"""
+        print("Startup profile:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<18} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<18} {(self.last - self.start) * 1000:8.1f} ms")
+
+class Instrumentation:
+    """Timers and counters around hot paths, exportable as a Chrome trace"""
+    
+    def __init__(self, max_events=20000):
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.stats = {}  # name -> [count, total seconds, max seconds]
+        self.events = collections.deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+    
+    def record(self, name, start, duration):
+        """Add one timed span"""
+        with self.lock:
+            entry = self.stats.get(name)
+            if entry is None:
+                entry = self.stats[name] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += duration
+            if duration > entry[2]:
+                entry[2] = duration
+            self.events.append((name, start, duration, threading.get_ident()))
+    
+    def timed(self, name):
+        """Decorator timing every call of a function under name"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+    
+    def lateness(self, name, due):
+        """Record how late a timer fired compared to when it was due"""
+        if self.enabled:
+            now = time.perf_counter()
+            self.record(name, due, max(0.0, now - due))
+    
+    def snapshot(self):
+        """Return [(name, count, average ms, max ms)] sorted by total time"""
+        with self.lock:
+            rows = [(name, count, total / count * 1000, peak * 1000, total)
+                    for name, (count, total, peak) in self.stats.items()]
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return [row[:4] for row in rows]
+    
+    def reset(self):
+        """Forget all recorded spans"""
+        with self.lock:
+            self.stats.clear()
+            self.events.clear()
+    
+    def export_trace(self, path):
+        """Write recorded spans in the Chrome trace format (chrome://tracing, Perfetto)"""
+        with self.lock:
+            events = list(self.events)
+        pid = os.getpid()
+        trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                  'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6}
+                 for name, start, duration, tid in events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        return len(trace)
+
+INSTRUMENTS = Instrumentation()
 
 # Simple default schedule
 DEFAULT_SCHEDULE = {
@@ -50,94 +191,2499 @@ DEFAULT_SCHEDULE = {
     ]
 }
 
-class StudyPlanner:
-    def __init__(self):
-        # Clean up any existing lock files first
-        self.cleanup_lock_files()
-        
-        self.home_dir = os.path.expanduser("~")
-        self.schedule_file = os.path.join(self.home_dir, ".study_planner_schedule.json")
-        self.lock_file = "/tmp/study_planner.lock"
-        
-        # Check if already running
-        if self.is_already_running():
-            print("Study Planner is already running!")
+# Number of journal records after which a background compaction is started
+JOURNAL_COMPACT_THRESHOLD = 200
+
+# Height in pixels of one row in the virtualized task list
+TASK_ROW_HEIGHT = 40
+
+# Extra rows kept materialized above and below the viewport
+TASK_ROW_OVERSCAN = 2
+
+# Weeks shown in the analytics view, about one semester
+ANALYTICS_WEEKS = 20
+
+# Minutes per block the optimizer assigns to a single subject
+PLAN_BLOCK_MINUTES = 30
+
+# Most minutes of one subject the optimizer puts on a single day
+PLAN_MAX_DAILY_MINUTES = 180
+
+# Pomodoro phase lengths in minutes
+POMODORO_FOCUS_MINUTES = 25
+POMODORO_BREAK_MINUTES = 5
+POMODORO_LONG_BREAK_MINUTES = 15
+POMODORO_CYCLES_PER_LONG_BREAK = 4
+
+# Open-ended recurring calendar events are expanded this many days ahead
+ICAL_RECURRENCE_HORIZON_DAYS = 366
+
+# Bump when the layout of the startup view cache changes
+VIEW_CACHE_VERSION = 1
+
+# Spaced repetition (SM-2): quality recorded when a task is ticked off, review slots
+REVIEW_PREFIX = "Review: "
+REVIEW_DEFAULT_QUALITY = 4
+REVIEW_INITIAL_EASINESS = 2.5
+REVIEW_START_MINUTE = 20 * 60
+REVIEW_TASK_MINUTES = 30
+
+# Reminders: minutes of warning before a task starts, days planned ahead
+REMINDER_LEAD_MINUTES = 5
+REMINDER_HORIZON_DAYS = 14
+
+# Longest sleep of the reminder thread, so suspend and clock changes are noticed
+REMINDER_MAX_SLEEP = 300
+
+# Shared HTTP server: pooled connections and cache sizes
+SERVER_POOL_SIZE = 4
+SERVER_CACHED_USERS = 256
+SERVER_CACHED_DAYS = 62
+SERVER_DEFAULT_PORT = 8765
+
+# Seconds between conditional GETs of the shown day when syncing with a server
+SYNC_POLL_SECONDS = 15
+
+# Seconds to wait for more changes before writing a batch to disk
+PERSIST_COALESCE_WINDOW = 0.5
+
+class PersistenceWorker:
+    """Background writer that coalesces journal records into batched writes"""
+    
+    def __init__(self, write_batch, window=PERSIST_COALESCE_WINDOW):
+        self.write_batch = write_batch
+        self.window = window
+        self.pending = {}  # Coalescing key -> latest record, in arrival order
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.last_flush_latency = 0.0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    @staticmethod
+    def record_key(record):
+        """Records with the same key supersede each other"""
+        return (record.get('op'), record.get('day'))
+    
+    def submit(self, record):
+        """Queue a record; returns immediately"""
+        with self.condition:
+            key = self.record_key(record)
+            self.pending.pop(key, None)
+            self.pending[key] = record
+            self.condition.notify_all()
+    
+    @property
+    def pending_writes(self):
+        """Number of records not yet on disk"""
+        return len(self.pending)
+    
+    def run(self):
+        """Worker loop: wait for work, let the window collect more, write"""
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped and not self.pending:
+                    return
+                deadline = time.monotonic() + self.window
+                while not self.stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch = list(self.pending.values())
+                self.pending.clear()
+            
+            start = time.perf_counter()
+            try:
+                self.write_batch(batch)
+            finally:
+                self.last_flush_latency = time.perf_counter() - start
+    
+    def stop(self):
+        """Flush remaining records and end the worker thread"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join()
+
+def tasks_from_dicts(schedule):
+    """Convert a weekday -> list of dicts schedule into Task records"""
+    return {day: [Task.from_dict(task) for task in tasks] for day, tasks in schedule.items()}
+
+class StudySession:
+    """Pomodoro session on one task, timed from the monotonic clock"""
+    
+    def __init__(self, day, position, task):
+        self.day = day
+        self.position = position
+        self.task = task
+        self.started_at = datetime.now()
+        self.phase = 'focus'
+        self.cycle = 1
+        self.focus_seconds = 0.0  # Focus time of finished phases
+        self.phase_elapsed = 0.0  # Time of the current phase before the last pause
+        self.resumed_at = time.monotonic()
+        self.logged_minutes = None  # Minutes logged on the task by earlier sessions
+    
+    @property
+    def running(self):
+        return self.resumed_at is not None
+    
+    def phase_length(self):
+        """Length of the current phase in seconds"""
+        if self.phase == 'focus':
+            return POMODORO_FOCUS_MINUTES * 60
+        if self.cycle % POMODORO_CYCLES_PER_LONG_BREAK == 0:
+            return POMODORO_LONG_BREAK_MINUTES * 60
+        return POMODORO_BREAK_MINUTES * 60
+    
+    def elapsed(self):
+        """Seconds spent in the current phase, never accumulated from ticks"""
+        if self.resumed_at is None:
+            return self.phase_elapsed
+        return self.phase_elapsed + time.monotonic() - self.resumed_at
+    
+    def remaining(self):
+        """Seconds left in the current phase"""
+        return self.phase_length() - self.elapsed()
+    
+    def pause(self):
+        if self.resumed_at is not None:
+            self.phase_elapsed = self.elapsed()
+            self.resumed_at = None
+    
+    def resume(self):
+        if self.resumed_at is None:
+            self.resumed_at = time.monotonic()
+    
+    def next_phase(self):
+        """Move from focus to break or from break to the next focus phase"""
+        if self.phase == 'focus':
+            self.focus_seconds += self.phase_length()
+            self.phase = 'break'
+        else:
+            self.phase = 'focus'
+            self.cycle += 1
+        self.phase_elapsed = 0.0
+        if self.resumed_at is not None:
+            self.resumed_at = time.monotonic()
+    
+    def focus_minutes(self):
+        """Minutes of focus time so far, including the running phase"""
+        seconds = self.focus_seconds
+        if self.phase == 'focus':
+            seconds += min(self.elapsed(), self.phase_length())
+        return seconds / 60
+
+class ReminderScheduler:
+    """Fires task start and end reminders from a min-heap, sleeping until the next one
+    
+    Rescheduling a day bumps its generation instead of searching the heap;
+    entries of older generations are skipped when they surface and the heap
+    is rebuilt once they make up half of it.
+    """
+    
+    def __init__(self, tasks_of, notify, lead_minutes=REMINDER_LEAD_MINUTES,
+                 horizon_days=REMINDER_HORIZON_DAYS):
+        self.tasks_of = tasks_of  # date -> tasks planned on it
+        self.notify = notify  # Called with (title, message) on the reminder thread
+        self.lead = timedelta(minutes=lead_minutes)
+        self.horizon_days = horizon_days
+        self.heap = []  # (timestamp, sequence, date, generation, kind, position, task)
+        self.sequence = itertools.count()
+        self.generations = {}  # date -> current generation
+        self.day_events = {}  # date -> entries pushed in the current generation
+        self.stale = 0
+        self.fired = 0
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def start(self):
+        """Plan the horizon from today and start the reminder thread"""
+        today = date.today()
+        for offset in range(self.horizon_days):
+            self.reschedule_day(today + timedelta(days=offset))
+        self.thread.start()
+    
+    @property
+    def pending(self):
+        """Number of reminders still to fire"""
+        return len(self.heap) - self.stale
+    
+    def events_of(self, day, tasks):
+        """Yield (time, kind, position, task) for the reminders of a day"""
+        midnight = datetime.combine(day, datetime.min.time())
+        for position, task in enumerate(tasks):
+            time_range = parse_time_range(task.time)
+            if time_range is None:
+                continue
+            yield midnight + timedelta(minutes=time_range[0]) - self.lead, 'start', position, task
+            yield midnight + timedelta(minutes=time_range[1]), 'end', position, task
+    
+    def reschedule_day(self, day, tasks=None):
+        """Replace the pending reminders of a day"""
+        if tasks is None:
+            tasks = self.tasks_of(day)
+        now = datetime.now()
+        events = [event for event in self.events_of(day, tasks) if event[0] > now]
+        with self.condition:
+            generation = self.generations.get(day, 0) + 1
+            self.generations[day] = generation
+            self.stale += self.day_events.get(day, 0)
+            self.day_events[day] = len(events)
+            for when, kind, position, task in events:
+                heapq.heappush(self.heap, (when.timestamp(), next(self.sequence), day,
+                                           generation, kind, position, task))
+            if self.stale > 64 and self.stale * 2 > len(self.heap):
+                self.compact()
+            self.condition.notify()
+    
+    def compact(self):
+        """Drop superseded entries, called with the condition held"""
+        self.heap = [entry for entry in self.heap if self.generations.get(entry[2]) == entry[3]]
+        heapq.heapify(self.heap)
+        self.stale = 0
+    
+    def extend_horizon(self):
+        """At midnight forget past days and plan the day entering the horizon"""
+        today = date.today()
+        with self.condition:
+            # A past day stays until its last reminder has fired, like the end of
+            # a 23:00-01:00 task; the next midnight forgets it
+            for day in [day for day in self.generations
+                        if day < today and not self.day_events.get(day)]:
+                del self.generations[day]
+                self.day_events.pop(day, None)
+        last = today + timedelta(days=self.horizon_days - 1)
+        if last not in self.generations:
+            self.reschedule_day(last)
+    
+    def run(self):
+        """Sleep until the earliest reminder is due, fire it, repeat"""
+        next_midnight = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        while True:
+            due = []
+            with self.condition:
+                while not self.stopped:
+                    now = time.time()
+                    while self.heap and self.generations.get(self.heap[0][2]) != self.heap[0][3]:
+                        heapq.heappop(self.heap)
+                        self.stale -= 1
+                    if self.heap and self.heap[0][0] <= now:
+                        entry = heapq.heappop(self.heap)
+                        self.day_events[entry[2]] -= 1
+                        due.append(entry)
+                        continue
+                    if due or now >= next_midnight.timestamp():
+                        break
+                    wake = min(self.heap[0][0] if self.heap else float('inf'),
+                               next_midnight.timestamp())
+                    self.condition.wait(min(wake - now, REMINDER_MAX_SLEEP))
+                if self.stopped:
+                    return
+            
+            if time.time() >= next_midnight.timestamp():
+                self.extend_horizon()
+                next_midnight = datetime.combine(date.today() + timedelta(days=1),
+                                                 datetime.min.time())
+            for entry in due:
+                self.fire(*entry[2:])
+    
+    def fire(self, day, generation, kind, position, task):
+        """Notify about one reminder unless the task was completed meanwhile"""
+        current = self.tasks_of(day)
+        if position >= len(current) or current[position].subject != task.subject \
+                or current[position].completed:
             return
+        self.fired += 1
+        if kind == 'start':
+            minutes = int(self.lead.total_seconds() // 60)
+            title = f"{task.subject} starts in {minutes} min" if minutes else f"Time for {task.subject}"
+            message = f"{task.time} ({task.duration})"
+        else:
+            title = f"{task.subject} is over"
+            message = f"{task.time}: mark it done if you finished it"
+        try:
+            self.notify(title, message)
+        except Exception as e:
+            print(f"Error showing reminder: {e}")
+    
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread.is_alive():
+            self.thread.join()
+
+@functools.lru_cache(maxsize=None)
+def notify_send_path():
+    """Location of notify-send, looked up once"""
+    return shutil.which('notify-send')
+
+def desktop_notify(title, message):
+    """Show a desktop notification through notify-send, return whether it was sent"""
+    if notify_send_path() is None:
+        return False
+    try:
+        subprocess.Popen([notify_send_path(), '--app-name=Study Planner', title, message],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        print(f"Error sending notification: {e}")
+        return False
+    return True
+
+def review_subject(subject):
+    """Subject a task reviews; review tasks carry REVIEW_PREFIX"""
+    if subject.startswith(REVIEW_PREFIX):
+        return subject[len(REVIEW_PREFIX):]
+    return subject
+
+def sm2_step(repetitions, interval, easiness, quality):
+    """One SM-2 update: return (repetitions, interval in days, easiness) after a review
+    
+    quality runs from 0 (blackout) to 5 (perfect); below 3 starts over.
+    """
+    if quality < 3:
+        repetitions, interval = 0, 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = int(round(interval * easiness))
+        repetitions += 1
+    easiness = max(1.3, easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return repetitions, interval, easiness
+
+class ScheduleStore:
+    """Dated task history in SQLite, indexed by date and by subject"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.last_write_latency = 0.0
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    time TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    duration TEXT NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    minutes INTEGER NOT NULL DEFAULT 0,
+                    start_minute INTEGER,
+                    end_minute INTEGER,
+                    UNIQUE (date, position)
+                )""")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_by_subject ON tasks (subject, date, position)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS day_stats (
+                    date TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    tasks INTEGER NOT NULL,
+                    done INTEGER NOT NULL,
+                    planned_minutes INTEGER NOT NULL,
+                    done_minutes INTEGER NOT NULL,
+                    PRIMARY KEY (date, subject)
+                )""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS study_log (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    subject TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    minutes REAL NOT NULL
+                )""")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS study_log_by_task ON study_log (date, position)")
+            self.migrate_typed_columns()
+            self.create_review_tables()
+            self.untracked = {row[0] for row in
+                              self.conn.execute("SELECT subject FROM review_exclusions")}
+    
+    def migrate_typed_columns(self):
+        """Add parsed minute columns and aggregates to databases from before they existed"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if 'minutes' in columns:
+            return
+        for column in ('minutes', 'start_minute', 'end_minute'):
+            self.conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} INTEGER")
+        rows = self.conn.execute("SELECT id, time, duration FROM tasks").fetchall()
+        self.conn.executemany(
+            "UPDATE tasks SET minutes = ?, start_minute = ?, end_minute = ? WHERE id = ?",
+            ((parse_duration_minutes(row['duration']),)
+             + (parse_time_range(row['time']) or (None, None)) + (row['id'],)
+             for row in rows))
+        self.conn.execute("DELETE FROM day_stats")
+        self.conn.execute("""
+            INSERT INTO day_stats
+            SELECT date, subject, COUNT(*), SUM(completed),
+                   SUM(minutes), SUM(minutes * completed)
+            FROM tasks GROUP BY date, subject""")
+    
+    def create_review_tables(self):
+        """Spaced repetition state per subject, seeded once from the completion history"""
+        seed = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_items'"
+        ).fetchone() is None
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS review_items (
+                subject TEXT PRIMARY KEY,
+                repetitions INTEGER NOT NULL,
+                interval INTEGER NOT NULL,
+                easiness REAL NOT NULL,
+                due TEXT NOT NULL,
+                last_review TEXT NOT NULL
+            )""")
+        # The due queue: earliest first, harder subjects first on the same day
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS review_items_by_due ON review_items (due, easiness)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                id INTEGER PRIMARY KEY,
+                subject TEXT NOT NULL,
+                date TEXT NOT NULL,
+                position INTEGER,
+                quality INTEGER NOT NULL,
+                previous TEXT
+            )""")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS reviews_by_task ON reviews (date, position)")
+        # Subjects the user turned reviews off for, such as breaks or planning blocks
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS review_exclusions (subject TEXT PRIMARY KEY)")
+        if seed:
+            rows = self.conn.execute(
+                "SELECT date, position, subject, minutes FROM tasks WHERE completed = 1 "
+                "ORDER BY date, position").fetchall()
+            for row in rows:
+                if row['minutes'] <= 0:
+                    continue
+                self.apply_review(review_subject(row['subject']), row['date'],
+                                  REVIEW_DEFAULT_QUALITY, row['position'])
+    
+    def tracks(self, subject, minutes=1):
+        """Whether completing a task counts as a review of its subject
         
-        self.schedule = self.load_schedule()
-        self.current_day = None
-        self.task_widgets = {}  # Store task widgets to prevent blinking
-        self.setup_gui()
-        
-    def cleanup_lock_files(self):
-        """Clean up any existing lock files"""
-        lock_files = [
-            "/tmp/study_planner.lock",
-            "/tmp/study_planner_doom.lock",
-            "/tmp/study_planner_v1.6.lock"
-        ]
-        for lock_file in lock_files:
+        Blocks without a duration never do; other subjects unless set_tracked turned them off.
+        """
+        return minutes > 0 and review_subject(subject) not in self.untracked
+    
+    @INSTRUMENTS.timed('store.set_tracked')
+    def set_tracked(self, subject, tracked):
+        """Turn spaced repetition of a subject on or off; off also drops its queue entry"""
+        subject = review_subject(subject)
+        with self.write():
+            if tracked:
+                self.conn.execute("DELETE FROM review_exclusions WHERE subject = ?", (subject,))
+                self.untracked.discard(subject)
+            else:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO review_exclusions VALUES (?)", (subject,))
+                self.conn.execute("DELETE FROM review_items WHERE subject = ?", (subject,))
+                self.untracked.add(subject)
+    
+    def apply_review(self, subject, key, quality, position=None):
+        """Update a subject's SM-2 state for a review on ISO date key; lock held by caller
+        
+        Only the first review of a subject per day counts. The previous state is
+        kept with the review so unticking the task can roll it back.
+        """
+        item = self.conn.execute(
+            "SELECT * FROM review_items WHERE subject = ?", (subject,)).fetchone()
+        if item is not None and item['last_review'] >= key:
+            return None
+        if item is None:
+            previous = None
+            state = (0, 0, REVIEW_INITIAL_EASINESS)
+        else:
+            previous = json.dumps([item['repetitions'], item['interval'], item['easiness'],
+                                   item['due'], item['last_review']])
+            state = (item['repetitions'], item['interval'], item['easiness'])
+        repetitions, interval, easiness = sm2_step(*state, quality)
+        due = (date.fromisoformat(key) + timedelta(days=interval)).isoformat()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO review_items VALUES (?, ?, ?, ?, ?, ?)",
+            (subject, repetitions, interval, easiness, due, key))
+        self.conn.execute(
+            "INSERT INTO reviews (subject, date, position, quality, previous) "
+            "VALUES (?, ?, ?, ?, ?)", (subject, key, position, quality, previous))
+        return due, interval
+    
+    def undo_review(self, subject, key, position):
+        """Roll back the review a ticked task recorded, if it is still the latest one"""
+        review = self.conn.execute(
+            "SELECT id, previous FROM reviews WHERE date = ? AND position IS ? AND subject = ? "
+            "ORDER BY id DESC LIMIT 1", (key, position, subject)).fetchone()
+        if review is None:
+            return
+        latest = self.conn.execute(
+            "SELECT MAX(id) FROM reviews WHERE subject = ?", (subject,)).fetchone()[0]
+        if latest != review['id']:
+            return
+        self.conn.execute("DELETE FROM reviews WHERE id = ?", (review['id'],))
+        if review['previous'] is None:
+            self.conn.execute("DELETE FROM review_items WHERE subject = ?", (subject,))
+        else:
+            self.conn.execute(
+                "UPDATE review_items SET repetitions = ?, interval = ?, easiness = ?, "
+                "due = ?, last_review = ? WHERE subject = ?",
+                tuple(json.loads(review['previous'])) + (subject,))
+    
+    @contextlib.contextmanager
+    def write(self):
+        """One committed write transaction, timed for the persistence status line"""
+        start = time.perf_counter()
+        with self.lock, self.conn:
+            yield
+        self.last_write_latency = time.perf_counter() - start
+    
+    @INSTRUMENTS.timed('store.record_review')
+    def record_review(self, subject, day, quality):
+        """Record a rated review, replacing that day's review if there is one
+        
+        Returns (next due date, interval), or None if a later review exists.
+        """
+        subject = review_subject(subject)
+        key = day.isoformat()
+        with self.write():
+            earlier = self.conn.execute(
+                "SELECT position FROM reviews WHERE subject = ? AND date = ? "
+                "ORDER BY id DESC LIMIT 1", (subject, key)).fetchone()
+            position = None
+            if earlier is not None:
+                position = earlier['position']
+                self.undo_review(subject, key, position)
+            result = self.apply_review(subject, key, quality, position)
+        if result is None:
+            return None
+        return date.fromisoformat(result[0]), result[1]
+    
+    def due_reviews(self, until, since=None, limit=32):
+        """Return [(subject, due date, interval, easiness)] due by a date, most urgent first"""
+        query = "SELECT subject, due, interval, easiness FROM review_items WHERE due <= ?"
+        params = [until.isoformat()]
+        if since is not None:
+            query += " AND due >= ?"
+            params.append(since.isoformat())
+        query += " ORDER BY due, easiness LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [(row[0], date.fromisoformat(row[1]), row[2], row[3]) for row in rows]
+    
+    @staticmethod
+    def row_to_task(row):
+        """Convert a database row to a Task record"""
+        return Task(row['time'], row['subject'], row['duration'],
+                    row['completed'], row['minutes'])
+    
+    def has_day(self, day):
+        """Check whether tasks were ever stored for a date"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM tasks WHERE date = ? LIMIT 1", (day.isoformat(),)).fetchone()
+        return row is not None
+    
+    def tasks_on(self, day):
+        """Return the tasks stored for a date, in display order"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM tasks WHERE date = ? ORDER BY position",
+                (day.isoformat(),)).fetchall()
+        return [self.row_to_task(row) for row in rows]
+    
+    def ensure_day(self, day, template):
+        """Return tasks for a date, creating them from the weekday template once"""
+        tasks = self.tasks_on(day)
+        if tasks or not template:
+            return tasks
+        tasks = [task.replace(completed=False) for task in template]
+        self.replace_day(day, tasks)
+        return tasks
+    
+    @INSTRUMENTS.timed('store.replace_day')
+    def replace_day(self, day, tasks):
+        """Replace all tasks of a date; tasks may be any iterable, even a generator"""
+        key = day.isoformat()
+        stats = {}
+        
+        def rows():
+            for i, task in enumerate(tasks):
+                minutes = task.minutes
+                start, end = parse_time_range(task.time) or (None, None)
+                completed = int(task.completed)
+                entry = stats.setdefault(task.subject, [0, 0, 0, 0])
+                entry[0] += 1
+                entry[1] += completed
+                entry[2] += minutes
+                entry[3] += minutes * completed
+                yield (key, i, task.time, task.subject, task.duration,
+                       completed, minutes, start, end)
+        
+        with self.write():
+            self.conn.execute("DELETE FROM tasks WHERE date = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO tasks (date, position, time, subject, duration, completed, "
+                "minutes, start_minute, end_minute) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows())
+            self.conn.execute("DELETE FROM day_stats WHERE date = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO day_stats VALUES (?, ?, ?, ?, ?, ?)",
+                ((key, subject) + tuple(entry) for subject, entry in stats.items()))
+    
+    @INSTRUMENTS.timed('store.set_completed')
+    def set_completed(self, day, position, completed):
+        """Update the completion flag of a single task, its aggregates and its review in O(1)"""
+        key = day.isoformat()
+        with self.write():
+            row = self.conn.execute(
+                "SELECT subject, minutes, completed FROM tasks WHERE date = ? AND position = ?",
+                (key, position)).fetchone()
+            if row is None or bool(row['completed']) == bool(completed):
+                return
+            sign = 1 if completed else -1
+            self.conn.execute(
+                "UPDATE tasks SET completed = ? WHERE date = ? AND position = ?",
+                (int(completed), key, position))
+            self.conn.execute(
+                "UPDATE day_stats SET done = done + ?, done_minutes = done_minutes + ? "
+                "WHERE date = ? AND subject = ?",
+                (sign, sign * row['minutes'], key, row['subject']))
+            if not self.tracks(row['subject'], row['minutes']):
+                return
+            if completed:
+                self.apply_review(review_subject(row['subject']), key,
+                                  REVIEW_DEFAULT_QUALITY, position)
+            else:
+                self.undo_review(review_subject(row['subject']), key, position)
+    
+    def progress(self, day):
+        """Return (completed, total) for a date"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(done), 0), COALESCE(SUM(tasks), 0) "
+                "FROM day_stats WHERE date = ?",
+                (day.isoformat(),)).fetchone()
+        return row[0], row[1]
+    
+    def daily_progress(self, start, end):
+        """Return {date: (completed, total)} for the stored days of a date range"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT date, SUM(done), SUM(tasks) FROM day_stats "
+                "WHERE date BETWEEN ? AND ? GROUP BY date",
+                (start.isoformat(), end.isoformat())).fetchall()
+        return {date.fromisoformat(row[0]): (row[1], row[2]) for row in rows}
+    
+    def weekly_totals(self, start, end):
+        """Return [(week start date, planned minutes, done minutes)] from the aggregates"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT date(date, '-' || ((strftime('%w', date) + 6) % 7) || ' days') AS week, "
+                "SUM(planned_minutes), SUM(done_minutes) FROM day_stats "
+                "WHERE date BETWEEN ? AND ? GROUP BY week ORDER BY week",
+                (start.isoformat(), end.isoformat())).fetchall()
+        return [(date.fromisoformat(row[0]), row[1], row[2]) for row in rows]
+    
+    def subject_totals(self, start, end):
+        """Return [(subject, planned minutes, done minutes)] from the aggregates"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT subject, SUM(planned_minutes), SUM(done_minutes) FROM day_stats "
+                "WHERE date BETWEEN ? AND ? GROUP BY subject ORDER BY SUM(done_minutes) DESC",
+                (start.isoformat(), end.isoformat())).fetchall()
+        return [tuple(row) for row in rows]
+    
+    @INSTRUMENTS.timed('store.log_study')
+    def log_study(self, day, position, subject, started_at, minutes):
+        """Record minutes actually studied on a task"""
+        with self.write():
+            self.conn.execute(
+                "INSERT INTO study_log (date, position, subject, started_at, minutes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (day.isoformat(), position, subject, started_at.isoformat(timespec='seconds'),
+                 minutes))
+    
+    def studied_minutes(self, day, position):
+        """Total minutes logged against a task"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(minutes), 0) FROM study_log WHERE date = ? AND position = ?",
+                (day.isoformat(), position)).fetchone()
+        return row[0]
+    
+    @INSTRUMENTS.timed('store.merge_tasks')
+    def merge_tasks(self, dated_tasks):
+        """Append (date, task) pairs to their days, skipping time+subject duplicates
+        
+        Returns (added, duplicates). The hash index of (time, subject) slots is
+        filled from the database once per touched date, so the input is streamed.
+        """
+        slots = {}  # date -> [set of (time, subject), next position]
+        stats = {}
+        added = duplicates = 0
+        with self.write():
+            for day, task in dated_tasks:
+                key = day.isoformat()
+                day_slots = slots.get(key)
+                if day_slots is None:
+                    rows = self.conn.execute(
+                        "SELECT time, subject, position FROM tasks WHERE date = ?",
+                        (key,)).fetchall()
+                    day_slots = slots[key] = [
+                        {(row['time'], row['subject']) for row in rows},
+                        max((row['position'] for row in rows), default=-1) + 1]
+                slot = (task.time, task.subject)
+                if slot in day_slots[0]:
+                    duplicates += 1
+                    continue
+                day_slots[0].add(slot)
+                
+                start, end = parse_time_range(task.time) or (None, None)
+                completed = int(task.completed)
+                self.conn.execute(
+                    "INSERT INTO tasks (date, position, time, subject, duration, completed, "
+                    "minutes, start_minute, end_minute) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, day_slots[1], task.time, task.subject, task.duration,
+                     completed, task.minutes, start, end))
+                day_slots[1] += 1
+                added += 1
+                entry = stats.setdefault((key, task.subject), [0, 0, 0, 0])
+                entry[0] += 1
+                entry[1] += completed
+                entry[2] += task.minutes
+                entry[3] += task.minutes * completed
+            
+            self.conn.executemany(
+                "INSERT INTO day_stats VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (date, subject) DO UPDATE SET "
+                "tasks = tasks + excluded.tasks, done = done + excluded.done, "
+                "planned_minutes = planned_minutes + excluded.planned_minutes, "
+                "done_minutes = done_minutes + excluded.done_minutes",
+                (slot + tuple(entry) for slot, entry in stats.items()))
+        return added, duplicates
+    
+    def tasks_between(self, start=None, end=None, page_size=1024):
+        """Yield (date, task) for every stored task in a date range, oldest first"""
+        query = "SELECT * FROM tasks WHERE (date, position) > (?, ?)"
+        if end is not None:
+            query += " AND date <= ?"
+        query += " ORDER BY date, position LIMIT ?"
+        
+        last = (start.isoformat() if start is not None else "", -1)
+        while True:
+            params = [last[0], last[1]]
+            if end is not None:
+                params.append(end.isoformat())
+            params.append(page_size)
+            with self.lock:
+                rows = self.conn.execute(query, params).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield date.fromisoformat(row['date']), self.row_to_task(row)
+            last = (rows[-1]['date'], rows[-1]['position'])
+    
+    def sessions_of(self, subject, start=None, end=None, page_size=256):
+        """Yield (date, task) for every session of a subject, oldest first"""
+        query = "SELECT * FROM tasks WHERE subject = ? AND (date, position) > (?, ?)"
+        if end is not None:
+            query += " AND date <= ?"
+        query += " ORDER BY date, position LIMIT ?"
+        
+        # Keyset pagination keeps memory flat and never holds the lock across a yield
+        last = (start.isoformat() if start is not None else "", -1)
+        while True:
+            params = [subject, last[0], last[1]]
+            if end is not None:
+                params.append(end.isoformat())
+            params.append(page_size)
+            with self.lock:
+                rows = self.conn.execute(query, params).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield date.fromisoformat(row['date']), self.row_to_task(row)
+            last = (rows[-1]['date'], rows[-1]['position'])
+    
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+# Calendar interchange: iCalendar (.ics) and CSV with date,time,subject,duration,completed
+CSV_COLUMNS = ('date', 'time', 'subject', 'duration', 'completed')
+CSV_TRUE = {'1', 'true', 'yes', 'x', '✓', 'done'}
+ICAL_DURATION_RE = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:\d+S)?)?$")
+ICAL_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+ICAL_WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+
+def calendar_format(path):
+    """Return 'ics' or 'csv' for calendar files, None for editor line files"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.ics', '.ical', '.ifb'):
+        return 'ics'
+    if extension == '.csv':
+        return 'csv'
+    return None
+
+def unfold_ical_lines(lines):
+    """Join folded iCalendar content lines, yielding (first line number, line)"""
+    pending, pending_lineno = None, 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_lineno, pending
+        pending, pending_lineno = line, lineno
+    if pending is not None:
+        yield pending_lineno, pending
+
+def parse_ical_datetime(value):
+    """Parse DATE or DATE-TIME values; UTC times are converted to local wall time"""
+    if 'T' not in value:
+        return datetime.strptime(value, "%Y%m%d")
+    moment = datetime.strptime(value.rstrip('Z'), "%Y%m%dT%H%M%S")
+    if value.endswith('Z'):
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    return moment
+
+def unescape_ical_text(value):
+    """Undo iCalendar TEXT escaping"""
+    return ICAL_ESCAPE_RE.sub(lambda m: ' ' if m.group(1) in 'nN' else m.group(1), value)
+
+def escape_ical_text(value):
+    """Apply iCalendar TEXT escaping"""
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+
+def expand_recurrence(start, rule, exdates):
+    """Yield the start times of a DAILY or WEEKLY RRULE, honouring COUNT, UNTIL and EXDATE"""
+    parts = dict(part.split('=', 1) for part in rule.split(';') if '=' in part)
+    freq = parts.get('FREQ')
+    if freq not in ('DAILY', 'WEEKLY'):
+        raise TaskLineError(f"unsupported recurrence FREQ={freq}")
+    interval = max(1, int(parts.get('INTERVAL', 1)))
+    count = int(parts['COUNT']) if 'COUNT' in parts else None
+    until = parse_ical_datetime(parts['UNTIL']) if 'UNTIL' in parts else None
+    if until is not None and 'T' not in parts['UNTIL']:
+        until += timedelta(days=1) - timedelta(seconds=1)
+    horizon = start + timedelta(days=ICAL_RECURRENCE_HORIZON_DAYS)
+    
+    if freq == 'DAILY':
+        offsets = [0]
+        step = interval
+        first = start
+    else:
+        weekdays = [ICAL_WEEKDAYS[day[-2:]] for day in parts.get('BYDAY', '').split(',')
+                    if day[-2:] in ICAL_WEEKDAYS] or [start.weekday()]
+        offsets = sorted(set(weekdays))
+        step = 7 * interval
+        first = start - timedelta(days=start.weekday())
+    
+    produced = 0
+    period = first
+    while True:
+        for offset in offsets:
+            moment = period + timedelta(days=offset)
+            if moment < start:
+                continue
+            if (count is not None and produced >= count) or (until is not None and moment > until):
+                return
+            if count is None and until is None and moment > horizon:
+                return
+            produced += 1
+            if moment not in exdates:
+                yield moment
+        period += timedelta(days=step)
+
+def event_task(start, end, subject, completed=False):
+    """Build a dated task from an event's start and end"""
+    minutes = int((end - start).total_seconds() // 60)
+    if minutes <= 0:
+        raise TaskLineError("event ends before it starts")
+    # '|' separates fields in the editor line format
+    subject = " ".join(subject.replace('|', '/').split())
+    if not subject:
+        raise TaskLineError("empty subject")
+    return Task(f"{start:%H:%M}-{end:%H:%M}", subject, format_duration(minutes), completed, minutes)
+
+def iter_ical_events(lines):
+    """Stream (line number, date, task, error) for every VEVENT occurrence"""
+    event = None
+    for lineno, line in unfold_ical_lines(lines):
+        name, _, value = line.partition(':')
+        name, _, params = name.partition(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {'lineno': lineno, 'EXDATE': set()}
+        elif event is None:
+            continue
+        elif name == 'END' and value.upper() == 'VEVENT':
             try:
-                if os.path.exists(lock_file):
-                    os.remove(lock_file)
-            except:
-                pass
+                yield from ical_event_occurrences(event)
+            except (TaskLineError, ValueError, KeyError) as e:
+                yield event['lineno'], None, None, str(e) or "malformed event"
+            event = None
+        elif name == 'EXDATE':
+            event['EXDATE'].update(parse_ical_datetime(item) for item in value.split(','))
+        elif name in ('DTSTART', 'DTEND', 'DURATION', 'SUMMARY', 'RRULE',
+                      'X-STUDY-PLANNER-COMPLETED'):
+            event[name] = value
+
+def ical_event_occurrences(event):
+    """Yield (line number, date, task, error) for one parsed VEVENT"""
+    if 'DTSTART' not in event:
+        raise TaskLineError("event without DTSTART")
+    if 'T' not in event['DTSTART']:
+        raise TaskLineError("all-day event has no time range")
+    start = parse_ical_datetime(event['DTSTART'])
+    if 'DTEND' in event:
+        length = parse_ical_datetime(event['DTEND']) - start
+    elif 'DURATION' in event:
+        match = ICAL_DURATION_RE.match(event['DURATION'])
+        if not match:
+            raise TaskLineError(f"bad DURATION {event['DURATION']}")
+        weeks, days, hours, minutes = (int(part or 0) for part in match.groups())
+        length = timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes)
+    else:
+        length = timedelta(hours=1)
+    subject = unescape_ical_text(event.get('SUMMARY', ''))
+    completed = event.get('X-STUDY-PLANNER-COMPLETED', '').upper() == 'TRUE'
     
-    def is_already_running(self):
-        """Check if another instance is running"""
+    starts = [start]
+    if 'RRULE' in event:
+        starts = expand_recurrence(start, event['RRULE'], event['EXDATE'])
+    for moment in starts:
+        yield event['lineno'], moment.date(), event_task(moment, moment + length, subject, completed), None
+
+def iter_csv_events(lines):
+    """Stream (line number, date, task, error) from CSV rows with a header"""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        lineno = reader.line_num
         try:
-            if os.path.exists(self.lock_file):
-                # Check if the process is actually running
-                with open(self.lock_file, 'r') as f:
-                    pid = f.read().strip()
-                try:
-                    # Check if process exists
-                    os.kill(int(pid), 0)
-                    return True  # Process is running
-                except (OSError, ValueError):
-                    # Process doesn't exist, remove stale lock file
-                    os.remove(self.lock_file)
-                    return False
-            return False
-        except:
+            day = date.fromisoformat((row.get('date') or '').strip())
+            time_text = (row.get('time') or '').strip()
+            if not time_text and row.get('start') and row.get('end'):
+                time_text = f"{row['start'].strip()}-{row['end'].strip()}"
+            time_range = parse_time_range(time_text) if TASK_TIME_RE.match(time_text) else None
+            if time_range is None:
+                raise TaskLineError(f"bad time '{time_text}', expected HH:MM-HH:MM")
+            subject = (row.get('subject') or '').strip()
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=time_range[0])
+            end = start + timedelta(minutes=(time_range[1] - time_range[0]) % (24 * 60))
+            task = event_task(start, end, subject,
+                              (row.get('completed') or '').strip().lower() in CSV_TRUE)
+            duration = (row.get('duration') or '').strip()
+            if duration:
+                if not TASK_DURATION_RE.match(duration):
+                    raise TaskLineError(f"bad duration '{duration}', expected e.g. 1.5h, 45m or -")
+                task = Task(task.time, task.subject, duration, task.completed)
+        except (TaskLineError, ValueError) as e:
+            yield lineno, None, None, str(e)
+            continue
+        yield lineno, day, task, None
+
+def iter_calendar_file(path):
+    """Stream (line number, date, task, error) from an .ics or .csv file"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if calendar_format(path) == 'ics':
+            yield from iter_ical_events(f)
+        else:
+            yield from iter_csv_events(f)
+
+def write_calendar_file(path, dated_tasks):
+    """Stream (date, task) pairs into an .ics or .csv file, return the number written"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if calendar_format(path) == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for day, task in dated_tasks:
+                writer.writerow((day.isoformat(), task.time, task.subject, task.duration,
+                                 int(task.completed)))
+                count += 1
+            return count
+        
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Study Planner//EN\r\n")
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        for day, task in dated_tasks:
+            time_range = parse_time_range(task.time)
+            if time_range is None:
+                continue
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=time_range[0])
+            end = start + timedelta(minutes=(time_range[1] - time_range[0]) % (24 * 60) or 24 * 60)
+            uid = hashlib.sha1(f"{day}|{task.time}|{task.subject}".encode()).hexdigest()[:20]
+            f.write(f"BEGIN:VEVENT\r\nUID:{uid}@study-planner\r\nDTSTAMP:{stamp}\r\n"
+                    f"DTSTART:{start:%Y%m%dT%H%M%S}\r\nDTEND:{end:%Y%m%dT%H%M%S}\r\n"
+                    f"SUMMARY:{escape_ical_text(task.subject)}\r\n"
+                    f"X-STUDY-PLANNER-COMPLETED:{'TRUE' if task.completed else 'FALSE'}\r\n"
+                    "END:VEVENT\r\n")
+            count += 1
+        f.write("END:VCALENDAR\r\n")
+    return count
+
+def format_duration(minutes):
+    """Format minutes the way durations are written in schedules: 2h, 1.5h, 45m"""
+    if minutes and minutes % 30 == 0:
+        return f"{minutes / 60:g}h"
+    return f"{minutes}m"
+
+def format_clock(minute):
+    """Format minutes after midnight as HH:MM"""
+    return f"{minute // 60 % 24:02d}:{minute % 60:02d}"
+
+class StudySubject:
+    """A subject to plan: weekly hours, priority and optional deadline"""
+    __slots__ = ('name', 'minutes', 'priority', 'deadline')
+    
+    def __init__(self, name, hours, priority=1, deadline=None):
+        self.name = sys.intern(name)
+        self.minutes = int(round(float(hours) * 60))
+        self.priority = float(priority)
+        self.deadline = deadline
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a subject from its plan-spec JSON form"""
+        deadline = data.get('deadline')
+        return cls(data['name'], data['hours'], data.get('priority', 1),
+                   date.fromisoformat(deadline) if deadline else None)
+
+def optimize_week(subjects, availability, start, block_minutes=PLAN_BLOCK_MINUTES,
+                  max_daily_minutes=PLAN_MAX_DAILY_MINUTES, time_budget=0.05):
+    """Pack subjects into the free time of the seven days from start
+    
+    availability maps weekday names to lists of 'HH:MM-HH:MM' windows. A greedy
+    pass gives blocks to the most urgent subject until a day holds its even
+    share of the week's work, except that a deadline subject with no slack left
+    takes the block first (earliest deadline wins). A repair pass then moves
+    deadline work that still missed its deadline onto empty blocks or blocks of
+    subjects due later, a fill pass places what is left anywhere it fits, and
+    pairwise swaps cut subject switches and move deadline work earlier without
+    pushing a day over its share until time_budget runs out.
+    Returns ({date: [Task]}, {subject name: minutes that could not be placed}).
+    """
+    started = time.perf_counter()
+    
+    # Free time as chronological (day offset, start minute) blocks
+    blocks = []
+    for offset in range(7):
+        day_name = (start + timedelta(days=offset)).strftime("%A")
+        for window in availability.get(day_name, []):
+            window_range = parse_time_range(window)
+            if window_range is None:
+                continue
+            for minute in range(window_range[0], window_range[1] - block_minutes + 1,
+                                block_minutes):
+                blocks.append((offset, minute))
+    blocks.sort()
+    count = len(blocks)
+    day_start, day_end = {}, {}
+    for i, (offset, _) in enumerate(blocks):
+        day_start.setdefault(offset, i)
+        day_end[offset] = i + 1
+    # Even share of the week's work per available day, in whole blocks
+    total_minutes = sum(subject.minutes for subject in subjects)
+    day_share = -(-total_minutes // (len(day_start) * block_minutes)) * block_minutes \
+        if day_start else 0
+    
+    def days_left(subject, offset):
+        if subject.deadline is None:
+            return 7
+        return (subject.deadline - start).days - offset
+    
+    def adjacent(i, j):
+        return blocks[i][0] == blocks[j][0] and blocks[j][1] - blocks[i][1] == block_minutes
+    
+    remaining = {subject.name: subject.minutes for subject in subjects}
+    daily = {}
+    load = {}  # day offset -> minutes assigned
+    assigned = [None] * count
+    
+    def assign(i, subject):
+        """Give block i to subject, returning its minutes to the previous owner"""
+        offset = blocks[i][0]
+        previous = assigned[i]
+        if previous is not None:
+            remaining[previous.name] += block_minutes
+            daily[(previous.name, offset)] -= block_minutes
+        else:
+            load[offset] = load.get(offset, 0) + block_minutes
+        assigned[i] = subject
+        remaining[subject.name] -= block_minutes
+        daily[(subject.name, offset)] = daily.get((subject.name, offset), 0) + block_minutes
+    
+    def room(subject, offset):
+        """Blocks subject may still take on a day under the daily cap"""
+        return (max_daily_minutes - daily.get((subject.name, offset), 0)) // block_minutes
+    
+    def capacity(subject, i):
+        """Minutes subject could still get from block i up to its deadline"""
+        offset = blocks[i][0]
+        total = 0
+        for day in range(offset, min(6, offset + days_left(subject, offset)) + 1):
+            if day in day_start:
+                free = day_end[day] - (i if day == offset else day_start[day])
+                total += min(free, room(subject, day))
+        return total * block_minutes
+    
+    def choose(i, balanced):
+        """Subject for an unassigned block i, None if no subject can use it
+        
+        A balanced choice leaves a day that holds its share to urgent work.
+        """
+        offset = blocks[i][0]
+        best, best_score, urgent = None, 0.0, None
+        for subject in subjects:
+            left = days_left(subject, offset)
+            if remaining[subject.name] <= 0 or left < 0 or room(subject, offset) <= 0:
+                continue
+            # No slack before the deadline: this block is needed now
+            if subject.deadline is not None and capacity(subject, i) <= remaining[subject.name]:
+                if urgent is None or (subject.deadline, -subject.priority) < \
+                        (urgent.deadline, -urgent.priority):
+                    urgent = subject
+            score = subject.priority * remaining[subject.name] / (left + 1)
+            # Staying on the previous block's subject avoids a context switch
+            if i and assigned[i - 1] is subject and adjacent(i - 1, i):
+                score *= 1.5
+            if score > best_score:
+                best, best_score = subject, score
+        if balanced and load.get(offset, 0) >= day_share:
+            return urgent
+        return urgent or best
+    
+    # Greedy pass
+    for i in range(count):
+        subject = choose(i, True)
+        if subject is not None:
+            assign(i, subject)
+    
+    # Repair pass: deadline work still short takes empty blocks before its
+    # deadline, then blocks of subjects without an earlier deadline
+    for subject in sorted((subject for subject in subjects if subject.deadline is not None),
+                          key=lambda subject: (subject.deadline, -subject.priority)):
+        for take_empty in (True, False):
+            for i in range(count):
+                offset = blocks[i][0]
+                if remaining[subject.name] <= 0 or days_left(subject, offset) < 0:
+                    break
+                other = assigned[i]
+                if other is subject or (other is None) != take_empty or room(subject, offset) <= 0:
+                    continue
+                if other is not None and other.deadline is not None \
+                        and other.deadline <= subject.deadline:
+                    continue
+                assign(i, subject)
+    # Fill pass: displaced subjects and work beyond the shares take any empty block
+    for i in range(count):
+        if assigned[i] is None:
+            subject = choose(i, False)
+            if subject is not None:
+                assign(i, subject)
+    
+    def block_cost(k):
+        """Switch cost towards the next block plus lateness of deadline work"""
+        subject = assigned[k]
+        cost = 0.0
+        if k + 1 < count and adjacent(k, k + 1) and assigned[k + 1] is not subject:
+            cost += 1.0
+        if subject is not None and subject.deadline is not None:
+            cost += subject.priority * blocks[k][0] / (days_left(subject, 0) + 1)
+        return cost
+    
+    def swap_cost(i, j):
+        return sum(block_cost(k) for k in {i - 1, i, j - 1, j} if 0 <= k < count)
+    
+    def fits(subject, offset, other_offset):
+        """Can subject move from other_offset to offset within deadline and daily cap"""
+        if subject is None or offset == other_offset:
+            return True
+        return days_left(subject, offset) >= 0 and \
+            daily.get((subject.name, offset), 0) + block_minutes <= max_daily_minutes
+    
+    def move(subject, from_offset, to_offset):
+        if subject is not None and from_offset != to_offset:
+            daily[(subject.name, from_offset)] -= block_minutes
+            daily[(subject.name, to_offset)] = daily.get((subject.name, to_offset), 0) + block_minutes
+            load[from_offset] -= block_minutes
+            load[to_offset] = load.get(to_offset, 0) + block_minutes
+    
+    # Local search
+    improved = True
+    while improved and time.perf_counter() - started < time_budget:
+        improved = False
+        for i in range(count):
+            if time.perf_counter() - started >= time_budget:
+                break
+            for j in range(i + 1, count):
+                a, b = assigned[i], assigned[j]
+                if a is b:
+                    continue
+                day_i, day_j = blocks[i][0], blocks[j][0]
+                if not (fits(a, day_j, day_i) and fits(b, day_i, day_j)):
+                    continue
+                # Swapping with an empty block moves work to the other day
+                if (a is None) != (b is None) and day_i != day_j and \
+                        load.get(day_j if b is None else day_i, 0) + block_minutes > day_share:
+                    continue
+                before = swap_cost(i, j)
+                assigned[i], assigned[j] = b, a
+                if swap_cost(i, j) < before - 1e-9:
+                    move(a, day_i, day_j)
+                    move(b, day_j, day_i)
+                    improved = True
+                else:
+                    assigned[i], assigned[j] = a, b
+    
+    # Merge runs of one subject into sessions
+    plan = {start + timedelta(days=offset): [] for offset in range(7)}
+    i = 0
+    while i < count:
+        subject = assigned[i]
+        j = i
+        while j + 1 < count and assigned[j + 1] is subject and adjacent(j, j + 1):
+            j += 1
+        if subject is not None:
+            offset, first_minute = blocks[i]
+            end_minute = blocks[j][1] + block_minutes
+            plan[start + timedelta(days=offset)].append(Task(
+                f"{format_clock(first_minute)}-{format_clock(end_minute)}",
+                subject.name, format_duration(end_minute - first_minute)))
+        i = j + 1
+    unplaced = {subject.name: remaining[subject.name] for subject in subjects
+                if remaining[subject.name] > 0}
+    return plan, unplaced
+
+def runtime_dir():
+    """Private per-user directory for the instance lock and socket
+    
+    Anyone can create the /tmp fallback first, so an existing directory is only
+    used if it is a real directory owned by this user with mode 0700.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    path = os.path.join(base, "study-planner") if base else \
+        os.path.join(tempfile.gettempdir(), f"study-planner-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() \
+            or stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(f"{path} must be a directory owned by you with mode 0700")
+    return path
+
+def default_socket_path():
+    """Unix socket the running instance (GUI or daemon) listens on"""
+    return os.path.join(runtime_dir(), "planner.sock")
+
+def default_lock_path():
+    """Lock file held by the running instance"""
+    return os.path.join(runtime_dir(), "planner.lock")
+
+class InstanceLock:
+    """Single-instance lock held with fcntl.flock for the process lifetime"""
+    
+    def __init__(self, path=None):
+        self.path = path or default_lock_path()
+        self.fd = None
+    
+    def acquire(self):
+        """Take the lock, False if another process holds it"""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
             return False
+        # The kernel drops the lock if we crash, so there is never a stale lock
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
+    
+    def release(self):
+        """Release the lock"""
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+def send_request(socket_path, request, retries=10):
+    """Send one request to the running instance and return its reply"""
+    for attempt in range(retries):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+                with sock.makefile('r', encoding='utf-8') as reply:
+                    return json.loads(reply.readline())
+        except (FileNotFoundError, ConnectionRefusedError):
+            # The instance may hold the lock but still be starting up
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.1)
+
+class RequestServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering newline-delimited JSON requests"""
+    daemon_threads = True
+    
+    def __init__(self, socket_path, execute):
+        self.execute = execute
+        # The lock guarantees a socket left here belongs to a dead instance
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, RequestHandler)
+        os.chmod(socket_path, 0o600)
     
-    def create_lock_file(self):
-        """Create lock file"""
+    def server_close(self):
+        super().server_close()
         try:
-            with open(self.lock_file, 'w') as f:
-                f.write(str(os.getpid()))
-        except:
+            os.remove(self.server_address)
+        except OSError:
             pass
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Runs each request line through the server's execute callback"""
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.execute(json.loads(line))
+            except ValueError as e:
+                reply = {'ok': False, 'error': f"Bad request: {e}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+# Shared multi-user server: many users' dated tasks behind a small HTTP/JSON API
+SERVER_USER_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+SERVER_DAY_PATH_RE = re.compile(r"^/users/([^/]+)/days/(\d{4}-\d{2}-\d{2})(/toggle)?$")
+
+class LRUCache:
+    """Mapping with a capacity that evicts the least recently used key"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = collections.OrderedDict()
+    
+    def get(self, key, default=None):
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+    
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+    
+    def __len__(self):
+        return len(self.items)
+
+class ConnectionPool:
+    """A bounded set of SQLite connections shared by server threads"""
     
-    def remove_lock_file(self):
-        """Remove lock file"""
+    def __init__(self, path, size=SERVER_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self.created = 0
+        self.lock = threading.Lock()
+        self.idle = queue.LifoQueue()
+    
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def acquire(self):
+        """Take an idle connection, open a new one below the limit or wait for one"""
         try:
-            if os.path.exists(self.lock_file):
-                os.remove(self.lock_file)
-        except:
+            return self.idle.get_nowait()
+        except queue.Empty:
             pass
+        with self.lock:
+            if self.created < self.size:
+                self.created += 1
+                return self.connect()
+        return self.idle.get()
+    
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection for one transaction"""
+        conn = self.acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.idle.put(conn)
+    
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class SharedScheduleStore:
+    """Dated tasks of many users in one SQLite file, read through a per-user LRU cache
+    
+    Every write bumps the user's revision, which is what ETags are made of, so a
+    conditional GET is answered from the cache without touching the database.
+    """
+    
+    def __init__(self, path, pool_size=SERVER_POOL_SIZE, cached_users=SERVER_CACHED_USERS):
+        self.pool = ConnectionPool(path, pool_size)
+        self.cache = LRUCache(cached_users)  # user -> (revision, LRUCache of date -> tasks)
+        self.cache_lock = threading.Lock()
+        self.hits = self.misses = 0
+        with self.pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shared_tasks (
+                    user TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    time TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    duration TEXT NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user, date, position)
+                )""")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS shared_tasks_by_date ON shared_tasks (date, user)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS revisions (
+                    user TEXT PRIMARY KEY,
+                    revision INTEGER NOT NULL
+                )""")
+            # Marks every day a user stored, so a day cleared to no tasks stays stored
+            seed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'shared_days'"
+            ).fetchone() is None
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS shared_days (
+                    user TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    PRIMARY KEY (user, date)
+                )""")
+            if seed:
+                conn.execute(
+                    "INSERT OR IGNORE INTO shared_days SELECT DISTINCT user, date FROM shared_tasks")
+    
+    def cached_day(self, user, key):
+        """Return (revision, tasks) from the cache or None"""
+        with self.cache_lock:
+            entry = self.cache.get(user)
+            if entry is not None:
+                tasks = entry[1].get(key)
+                if tasks is not None:
+                    self.hits += 1
+                    return entry[0], tasks
+            self.misses += 1
+        return None
+    
+    def cache_entry(self, user, revision):
+        """Return the user's cache entry, starting an empty one for a newer revision"""
+        entry = self.cache.get(user)
+        if entry is None or entry[0] < revision:
+            entry = (revision, LRUCache(SERVER_CACHED_DAYS))
+            self.cache.put(user, entry)
+        return entry
+    
+    def cache_day(self, user, revision, key, tasks):
+        """Remember a day read at a revision, unless a newer write got there first"""
+        with self.cache_lock:
+            entry = self.cache_entry(user, revision)
+            if entry[0] == revision:
+                entry[1].put(key, tasks)
+    
+    def day(self, user, day):
+        """Return (revision, task dicts or None if never stored) for one user's date"""
+        key = day.isoformat()
+        cached = self.cached_day(user, key)
+        if cached is not None:
+            return cached
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT revision FROM revisions WHERE user = ?", (user,)).fetchone()
+            stored = conn.execute("SELECT 1 FROM shared_days WHERE user = ? AND date = ?",
+                                  (user, key)).fetchone()
+            rows = conn.execute(
+                "SELECT time, subject, duration, completed FROM shared_tasks "
+                "WHERE user = ? AND date = ? ORDER BY position", (user, key)).fetchall()
+        revision = row[0] if row else 0
+        tasks = [{'time': r['time'], 'subject': r['subject'], 'duration': r['duration'],
+                  'completed': bool(r['completed'])} for r in rows] if stored else None
+        self.cache_day(user, revision, key, tasks)
+        return revision, tasks
+    
+    def bump_revision(self, conn, user):
+        conn.execute(
+            "INSERT INTO revisions VALUES (?, 1) "
+            "ON CONFLICT (user) DO UPDATE SET revision = revision + 1", (user,))
+        return conn.execute("SELECT revision FROM revisions WHERE user = ?", (user,)).fetchone()[0]
+    
+    def replace_day(self, user, day, tasks):
+        """Store a user's tasks for a date, return the new revision"""
+        key = day.isoformat()
+        tasks = [Task.from_dict(task).to_dict() for task in tasks]
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM shared_tasks WHERE user = ? AND date = ?", (user, key))
+            conn.execute("INSERT OR IGNORE INTO shared_days VALUES (?, ?)", (user, key))
+            conn.executemany(
+                "INSERT INTO shared_tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((user, key, i, task['time'], task['subject'], task['duration'],
+                  int(task['completed'])) for i, task in enumerate(tasks)))
+            revision = self.bump_revision(conn, user)
+        self.cache_day(user, revision, key, tasks)
+        return revision
+    
+    def toggle(self, user, day, index):
+        """Flip one task, return (revision, completed) or None if there is no such task"""
+        key = day.isoformat()
+        with self.pool.connection() as conn:
+            changed = conn.execute(
+                "UPDATE shared_tasks SET completed = 1 - completed "
+                "WHERE user = ? AND date = ? AND position = ?", (user, key, index)).rowcount
+            if not changed:
+                return None
+            completed = conn.execute(
+                "SELECT completed FROM shared_tasks WHERE user = ? AND date = ? AND position = ?",
+                (user, key, index)).fetchone()[0]
+            revision = self.bump_revision(conn, user)
+        with self.cache_lock:
+            self.cache_entry(user, revision)
+        return revision, bool(completed)
+    
+    def summary(self, day):
+        """Return [(user, completed, total)] for a date across all users"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT user, SUM(completed), COUNT(*) FROM shared_tasks "
+                "WHERE date = ? GROUP BY user ORDER BY user", (day.isoformat(),)).fetchall()
+        return [tuple(row) for row in rows]
+    
+    def close(self):
+        self.pool.close()
+
+class ScheduleAPI:
+    """HTTP/JSON routes of the shared server, independent of the transport
+    
+    GET  /users/NAME/days/DATE         tasks of a date, with an ETag
+    PUT  /users/NAME/days/DATE         replace them with {"tasks": [...]}
+    POST /users/NAME/days/DATE/toggle  flip {"index": N}
+    GET  /summary?date=DATE            completion of every user on a date
+    """
+    
+    def __init__(self, store):
+        self.store = store
+    
+    @staticmethod
+    def etag(revision, day):
+        return f'"{revision}-{day.isoformat()}"'
+    
+    def handle(self, method, path, headers, body):
+        """Return (status, extra headers, JSON payload or None)"""
+        url = urllib_parse().urlsplit(path)
+        try:
+            if method == 'GET' and url.path == '/summary':
+                query = urllib_parse().parse_qs(url.query)
+                day = date.fromisoformat(query['date'][0]) if 'date' in query else date.today()
+                return 200, {}, {'date': day.isoformat(),
+                                 'users': self.store.summary(day),
+                                 'cache': {'hits': self.store.hits, 'misses': self.store.misses}}
+            
+            match = SERVER_DAY_PATH_RE.match(url.path)
+            if not match or not SERVER_USER_RE.match(match.group(1)):
+                return 404, {}, {'error': "Unknown resource"}
+            user, day, toggle = match.group(1), date.fromisoformat(match.group(2)), match.group(3)
+            
+            if method == 'GET' and not toggle:
+                revision, tasks = self.store.day(user, day)
+                if tasks is None:
+                    return 404, {}, {'error': f"No tasks stored for {user} on {day.isoformat()}"}
+                etag = self.etag(revision, day)
+                if etag in headers.get('If-None-Match', ''):
+                    return 304, {'ETag': etag}, None
+                return 200, {'ETag': etag}, {'user': user, 'date': day.isoformat(), 'tasks': tasks}
+            
+            if method == 'PUT' and not toggle:
+                revision = self.store.replace_day(user, day, json.loads(body)['tasks'])
+                return 200, {'ETag': self.etag(revision, day)}, {'ok': True, 'revision': revision}
+            
+            if method == 'POST' and toggle:
+                result = self.store.toggle(user, day, int(json.loads(body)['index']))
+                if result is None:
+                    return 404, {}, {'error': "No such task"}
+                return 200, {'ETag': self.etag(result[0], day)}, {'ok': True, 'completed': result[1]}
+            
+            return 405, {}, {'error': f"{method} not allowed here"}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {}, {'error': f"Bad request: {e}"}
+
+def urllib_parse():
+    """urllib.parse, imported on first use like the rest of the HTTP stack"""
+    import urllib.parse
+    return urllib.parse
+
+def serve_http(db_path, host='127.0.0.1', port=SERVER_DEFAULT_PORT):
+    """Serve the shared store over HTTP until interrupted"""
+    # Imported here so the GUI and the other commands never load the HTTP stack
+    import http.server
+    
+    store = SharedScheduleStore(db_path)
+    api = ScheduleAPI(store)
+    
+    class Handler(http.server.BaseHTTPRequestHandler):
+        server_version = "StudyPlanner/1.8"
+        protocol_version = "HTTP/1.1"
+        
+        def respond(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            status, headers, payload = api.handle(self.command, self.path, self.headers, body)
+            data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if payload is not None:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        do_GET = do_PUT = do_POST = respond
+        
+        def log_message(self, format, *args):
+            pass  # Polling clients would flood the terminal
+    
+    class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+        daemon_threads = True
+    
+    server = Server((host, port), Handler)
+    print(f"Study Planner server for {db_path} listening on http://{host}:{server.server_port}")
+    if host != 'localhost' and host != '::1' and not host.startswith('127.'):
+        print("Warning: requests are not authenticated, anyone who can reach this address "
+              "can read and change every user's tasks", file=sys.stderr)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.close()
+
+class ScheduleClient:
+    """Reads and writes one user's days on a shared server, remembering ETags"""
+    
+    def __init__(self, base_url, user, timeout=5):
+        self.base_url = base_url.rstrip('/')
+        self.user = user
+        self.timeout = timeout
+        self.etags = {}  # date -> ETag of the last version seen
+    
+    def url(self, day):
+        return f"{self.base_url}/users/{urllib_parse().quote(self.user)}/days/{day.isoformat()}"
+    
+    def fetch_day(self, day):
+        """Return task dicts if the day changed since the last call, None if unchanged
+        
+        A day cleared on the server comes back as []. Raises KeyError when the
+        server never stored the day.
+        """
+        import urllib.error
+        import urllib.request
+        request = urllib.request.Request(self.url(day))
+        if day in self.etags:
+            request.add_header('If-None-Match', self.etags[day])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self.etags[day] = response.headers.get('ETag')
+                return json.load(response)['tasks']
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None
+            if e.code == 404:
+                raise KeyError(day) from e
+            raise
+    
+    def push_day(self, day, tasks):
+        """Replace a day on the server"""
+        import urllib.request
+        request = urllib.request.Request(
+            self.url(day), method='PUT', data=json.dumps({'tasks': tasks}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            # Our own write must not look like a remote change on the next poll
+            self.etags[day] = response.headers.get('ETag')
+
+class ServerSync(threading.Thread):
+    """Background thread that pushes local changes and polls the watched day"""
+    
+    def __init__(self, client, on_remote_change, interval=SYNC_POLL_SECONDS):
+        super().__init__(daemon=True)
+        self.client = client
+        self.on_remote_change = on_remote_change
+        self.interval = interval
+        self.condition = threading.Condition()
+        self.pushes = collections.OrderedDict()  # date -> latest task dicts to upload
+        self.watched = None  # (date, local task dicts)
+        self.stopped = False
+        self.last_error = None
+    
+    def watch(self, day, tasks):
+        """Poll this day from now on; local tasks seed the server if it has none"""
+        with self.condition:
+            self.watched = (day, tasks)
+            self.condition.notify()
+    
+    def push(self, day, tasks):
+        with self.condition:
+            self.pushes[day] = tasks
+            self.condition.notify()
+    
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                if self.stopped:
+                    return
+                pushes, self.pushes = self.pushes, collections.OrderedDict()
+                watched = self.watched
+            try:
+                for day, tasks in pushes.items():
+                    self.client.push_day(day, tasks)
+                if watched is not None:
+                    day, local_tasks = watched
+                    try:
+                        tasks = self.client.fetch_day(day)
+                    except KeyError:
+                        # Only a day the server never stored is seeded from here
+                        self.client.push_day(day, local_tasks)
+                        tasks = None
+                    if tasks is not None:
+                        self.on_remote_change(day, tasks)
+                self.last_error = None
+            except OSError as e:
+                if str(e) != self.last_error:
+                    print(f"Error syncing with {self.client.base_url}: {e}")
+                self.last_error = str(e)
+            
+            with self.condition:
+                if not self.stopped and not self.pushes and self.watched is watched:
+                    self.condition.wait(self.interval)
+
+class PlannerCore:
+    """Schedule data and persistence shared by the GUI and headless modes"""
+    
+    def __init__(self, home_dir=None, background_writes=True):
+        self.home_dir = home_dir or os.path.expanduser("~")
+        self.schedule_file = os.path.join(self.home_dir, ".study_planner_schedule.json")
+        self.journal_file = self.schedule_file + ".journal"
+        self.store_file = os.path.join(self.home_dir, ".study_planner.db")
+        self.view_cache_file = os.path.join(self.home_dir, ".study_planner_view.cache")
+        self.journal_records = 0
+        self.journal_lock = threading.Lock()
+        self.compaction_thread = None
+        self.schedule_loader = None
+        self.loaded_schedule = None
+        
+        # The cache key has to be taken before the store is opened
+        cache = self.read_view_cache()
+        self.store = ScheduleStore(self.store_file)
+        today = date.today()
+        self.startup_view = None  # Cached today/week view for the first paint
+        if cache is not None and cache['date'] == today.isoformat():
+            # Today is already stored, so templates are parsed off the startup path
+            self.startup_view = cache
+            self.schedule_loader = threading.Thread(target=self.load_schedule_async, daemon=True)
+            self.schedule_loader.start()
+        else:
+            self.loaded_schedule = self.load_schedule()
+            # Make sure today exists in the dated store before the first paint
+            self.tasks_for(today)
+        self.persistence = PersistenceWorker(self.append_journal) if background_writes else None
+        self.reminders = None
     
     def load_schedule(self):
-        """Load schedule from file"""
+        """Load schedule snapshot from file and replay the journal on top"""
+        schedule = None
         try:
             if os.path.exists(self.schedule_file):
                 with open(self.schedule_file, 'r') as f:
-                    return json.load(f)
+                    schedule = json.load(f)
         except Exception as e:
             print(f"Error loading schedule: {e}")
-        return DEFAULT_SCHEDULE.copy()
+        if schedule is None:
+            schedule = json.loads(json.dumps(DEFAULT_SCHEDULE))
+        
+        # A leftover rotated journal means compaction was interrupted
+        self.journal_records = 0
+        for path in (self.journal_file + ".old", self.journal_file):
+            self.journal_records += self.replay_journal(schedule, path)
+        
+        # Journal replay works on the JSON form, the app works on Task records
+        return tasks_from_dicts(schedule)
+    
+    def load_schedule_async(self):
+        """Background half of a cached startup; holds the journal lock so the count is exact"""
+        with self.journal_lock:
+            self.loaded_schedule = self.load_schedule()
+    
+    @property
+    def schedule(self):
+        """Weekday templates, waiting for the background parse after a cached startup"""
+        loader = self.schedule_loader
+        if loader is not None:
+            loader.join()
+            self.schedule_loader = None
+        return self.loaded_schedule
+    
+    def source_key(self):
+        """(mtime, size) of every file the startup view is derived from"""
+        key = []
+        for path in (self.schedule_file, self.journal_file, self.journal_file + ".old",
+                     self.store_file, self.store_file + "-wal"):
+            try:
+                info = os.stat(path)
+                key.append((info.st_mtime_ns, info.st_size))
+            except OSError:
+                key.append(None)
+        return key
+    
+    def read_view_cache(self):
+        """Return the cached startup view if its source files are unchanged, else None"""
+        try:
+            with open(self.view_cache_file, 'rb') as f:
+                cache = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(cache, dict) or cache.get('version') != VIEW_CACHE_VERSION:
+            return None
+        if cache.get('key') != self.source_key():
+            return None
+        return cache
     
-    def save_schedule(self):
-        """Save schedule to file"""
+    def build_view_cache(self):
+        """Collect today's tasks, today's progress and this week's per-day progress
+        
+        Called on close: the view is read while the store is open, the key after
+        it is closed so the SQLite WAL has been checkpointed into the database.
+        """
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
         try:
-            with open(self.schedule_file, 'w') as f:
-                json.dump(self.schedule, f, indent=2)
+            # After midnight today may not be stored yet; the next start creates it
+            if not self.store.has_day(today):
+                return None
+            cache = {
+                'version': VIEW_CACHE_VERSION,
+                'date': today.isoformat(),
+                'today': [(task.time, task.subject, task.duration, task.completed, task.minutes)
+                          for task in self.store.tasks_on(today)],
+                'progress': self.store.progress(today),
+                'week_start': week_start.isoformat(),
+                'week': {day.isoformat(): progress for day, progress in
+                         self.store.daily_progress(week_start, week_start + timedelta(days=6)).items()},
+            }
+        except sqlite3.Error as e:
+            print(f"Error building view cache: {e}")
+            return None
+        return cache
+    
+    def save_view_cache(self, cache):
+        """Atomically write a view cache built by build_view_cache"""
+        cache['key'] = self.source_key()
+        tmp_file = self.view_cache_file + ".tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                marshal.dump(cache, f)
+            os.replace(tmp_file, self.view_cache_file)
+        except OSError as e:
+            print(f"Error writing view cache: {e}")
+    
+    def invalidate_view_cache(self):
+        """Drop the startup view cache after the schedule files were rewritten"""
+        try:
+            os.remove(self.view_cache_file)
+        except OSError:
+            pass
+    
+    def replay_journal(self, schedule, path):
+        """Apply journal records from path to schedule, return record count"""
+        count = 0
+        try:
+            if not os.path.exists(path):
+                return 0
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash, ignore the partial record
+                        continue
+                    self.apply_journal_record(schedule, record)
+                    count += 1
+        except Exception as e:
+            print(f"Error replaying journal: {e}")
+        return count
+    
+    @staticmethod
+    def apply_journal_record(schedule, record):
+        """Apply a single delta record; records are idempotent"""
+        if record.get('op') == 'day':
+            schedule[record.get('day')] = record.get('tasks', [])
+    
+    @INSTRUMENTS.timed('append_journal')
+    def append_journal(self, records):
+        """Append delta records instead of rewriting the whole schedule"""
+        try:
+            with self.journal_lock:
+                with open(self.journal_file, 'a') as f:
+                    f.write("".join(json.dumps(record, separators=(',', ':')) + "\n"
+                                    for record in records))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.journal_records += len(records)
+        except Exception as e:
+            print(f"Error writing journal: {e}")
+            return
+        
+        if self.journal_records >= JOURNAL_COMPACT_THRESHOLD:
+            self.start_compaction()
+    
+    def persist(self, record):
+        """Hand a change to the persistence worker, never blocking the UI"""
+        if self.persistence is not None:
+            self.persistence.submit(record)
+        else:
+            self.append_journal([record])
+    
+    def persistence_stats(self):
+        """Return (pending journal writes, last journal flush ms, last store commit ms)"""
+        commit = self.store.last_write_latency * 1000 if self.store is not None else 0.0
+        if self.persistence is None:
+            return 0, 0.0, commit
+        return (self.persistence.pending_writes, self.persistence.last_flush_latency * 1000,
+                commit)
+    
+    def start_compaction(self):
+        """Fold the journal into the snapshot in a background thread"""
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        
+        with self.journal_lock:
+            # Rotate so new records keep going to a fresh journal
+            old_journal = self.journal_file + ".old"
+            if not os.path.exists(old_journal) and os.path.exists(self.journal_file):
+                os.replace(self.journal_file, old_journal)
+            self.journal_records = 0
+        
+        self.compaction_thread = threading.Thread(target=self.compact_journal, daemon=True)
+        self.compaction_thread.start()
+    
+    @INSTRUMENTS.timed('compact_journal')
+    def compact_journal(self):
+        """Rebuild the snapshot from disk state, then drop the rotated journal"""
+        old_journal = self.journal_file + ".old"
+        try:
+            schedule = None
+            if os.path.exists(self.schedule_file):
+                with open(self.schedule_file, 'r') as f:
+                    schedule = json.load(f)
+            if schedule is None:
+                schedule = json.loads(json.dumps(DEFAULT_SCHEDULE))
+            self.replay_journal(schedule, old_journal)
+            self.write_snapshot(schedule)
+            os.remove(old_journal)
         except Exception as e:
-            print(f"Error saving schedule: {e}")
+            print(f"Error compacting journal: {e}")
+    
+    @INSTRUMENTS.timed('write_snapshot')
+    def write_snapshot(self, schedule):
+        """Atomically replace the snapshot file"""
+        self.invalidate_view_cache()
+        tmp_file = self.schedule_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(schedule, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.schedule_file)
+    
+    def tasks_for(self, day):
+        """Return the tasks of a date, creating them from the template if needed"""
+        tasks = self.store.tasks_on(day)
+        if tasks:
+            return tasks
+        return self.store.ensure_day(day, self.day_template(day))
+    
+    def planned_tasks(self, day):
+        """Tasks of a date without storing anything: stored tasks, else the
+        weekday template for today and later dates"""
+        tasks = self.store.tasks_on(day)
+        if tasks or day < date.today():
+            return tasks
+        return self.day_template(day)
+    
+    def day_template(self, day):
+        """The weekday template of a date plus review tasks for subjects due then"""
+        tasks = [task.replace(completed=False) for task in self.schedule.get(day.strftime("%A"), [])
+                 if not task.subject.startswith(REVIEW_PREFIX)]
+        return tasks + self.review_tasks(day, tasks)
+    
+    def review_tasks(self, day, tasks):
+        """Review tasks for subjects due on a date, placed after the day's last task
+        
+        Today also picks up overdue subjects; subjects already on the day's list
+        count as reviewed by studying them and get no extra task.
+        """
+        since = day if day > date.today() else None
+        due = self.store.due_reviews(day, since)
+        if not due:
+            return []
+        present = {review_subject(task.subject) for task in tasks}
+        ends = [time_range[1] for time_range in map(parse_time_range, (task.time for task in tasks))
+                if time_range and time_range[1] <= 24 * 60]
+        start = max([REVIEW_START_MINUTE] + ends)
+        reviews = []
+        for subject, _, _, _ in due:
+            if subject in present:
+                continue
+            if start + REVIEW_TASK_MINUTES > 24 * 60:
+                break
+            reviews.append(Task(f"{format_clock(start)}-{format_clock(start + REVIEW_TASK_MINUTES)}",
+                                REVIEW_PREFIX + subject, format_duration(REVIEW_TASK_MINUTES)))
+            start += REVIEW_TASK_MINUTES
+        return reviews
+    
+    def start_reminders(self, notify):
+        """Start firing reminders for the planned tasks of the coming days"""
+        self.reminders = ReminderScheduler(self.planned_tasks, notify)
+        self.reminders.start()
+    
+    def reschedule_reminders(self, day, template_changed=False):
+        """Refresh reminders after a date's tasks changed
+        
+        A new weekday template also changes the unstored dates of that weekday.
+        """
+        if self.reminders is None:
+            return
+        self.reminders.reschedule_day(day)
+        if template_changed:
+            today = date.today()
+            for offset in range(REMINDER_HORIZON_DAYS):
+                other = today + timedelta(days=offset)
+                if other != day and other.weekday() == day.weekday() \
+                        and not self.store.has_day(other):
+                    self.reminders.reschedule_day(other)
+    
+    def replace_tasks(self, day, tasks, as_template=None):
+        """Store edited tasks for a date, and as that weekday's template if asked
+        
+        as_template None makes edits of today the template and leaves it alone
+        for other dates; past dates never change the template.
+        """
+        # The dated tasks keep their state, the weekday template starts fresh
+        self.store.replace_day(day, tasks)
+        today = date.today()
+        if day < today:
+            return  # Correcting history does not change upcoming weeks
+        if not (day == today if as_template is None else as_template):
+            self.reschedule_reminders(day)
+            return
+        day_name = day.strftime("%A")
+        # Review tasks come from the due queue of each date, not from the template
+        template = [task.replace(completed=False) for task in tasks
+                    if not task.subject.startswith(REVIEW_PREFIX)]
+        self.schedule[day_name] = template
+        self.persist({'op': 'day', 'day': day_name,
+                      'tasks': [task.to_dict() for task in template]})
+        self.reschedule_reminders(day, template_changed=True)
+    
+    def plan_week(self, spec, start, dry_run=False):
+        """Optimize a week from a plan spec and store it, return (plan, unplaced minutes)"""
+        subjects = [StudySubject.from_dict(subject) for subject in spec['subjects']]
+        plan, unplaced = optimize_week(subjects, spec['availability'], start,
+                             spec.get('block_minutes', PLAN_BLOCK_MINUTES),
+                             spec.get('max_daily_minutes', PLAN_MAX_DAILY_MINUTES))
+        if not dry_run:
+            # A planned week is one week, not the template of every later one
+            for day, tasks in plan.items():
+                self.replace_tasks(day, tasks, as_template=False)
+        return plan, unplaced
+    
+    def import_tasks_file(self, day, path, max_errors=20):
+        """Stream a task file into a date, return (imported count, first errors)"""
+        errors = []
+        counter = [0]
+        
+        def valid_tasks():
+            for lineno, task, error in iter_tasks_file(path):
+                if error:
+                    if len(errors) < max_errors:
+                        errors.append(f"line {lineno}: {error}")
+                    continue
+                counter[0] += 1
+                yield task
+        
+        self.store.replace_day(day, valid_tasks())
+        self.reschedule_reminders(day)
+        return counter[0], errors
+    
+    @INSTRUMENTS.timed('import_calendar')
+    def import_calendar_file(self, path, max_errors=20):
+        """Stream calendar events into their dates, return (added, duplicates, first errors)"""
+        errors = []
+        
+        def valid_events():
+            for lineno, day, task, error in iter_calendar_file(path):
+                if error:
+                    if len(errors) < max_errors:
+                        errors.append(f"line {lineno}: {error}")
+                    continue
+                yield day, task
+        
+        added, duplicates = self.store.merge_tasks(valid_events())
+        if self.reminders is not None and added:
+            today = date.today()
+            for offset in range(REMINDER_HORIZON_DAYS):
+                self.reminders.reschedule_day(today + timedelta(days=offset))
+        return added, duplicates, errors
+    
+    def export_calendar_file(self, path, start=None, end=None):
+        """Write stored tasks of a date range to an .ics or .csv file"""
+        return write_calendar_file(path, self.store.tasks_between(start, end))
+    
+    def execute(self, request):
+        """Run a single request dict and return a JSON-serializable reply"""
+        try:
+            cmd = request.get('cmd')
+            day = date.fromisoformat(request['date']) if request.get('date') else date.today()
+            
+            if cmd == 'list':
+                return {'ok': True, 'date': day.isoformat(),
+                        'tasks': [task.to_dict() for task in self.tasks_for(day)]}
+            
+            if cmd == 'diagnostics':
+                reminders = self.reminders.pending if self.reminders is not None else 0
+                return {'ok': True, 'spans': INSTRUMENTS.snapshot(), 'reminders': reminders}
+            
+            if cmd == 'progress':
+                self.tasks_for(day)
+                completed, total = self.store.progress(day)
+                return {'ok': True, 'date': day.isoformat(),
+                        'completed': completed, 'total': total}
+            
+            if cmd == 'stats':
+                start = day - timedelta(weeks=int(request.get('weeks', ANALYTICS_WEEKS)))
+                return {'ok': True,
+                        'weeks': [(week.isoformat(), planned, done) for week, planned, done
+                                  in self.store.weekly_totals(start, day)],
+                        'subjects': self.store.subject_totals(start, day)}
+            
+            if cmd == 'reviews':
+                until = day + timedelta(days=int(request.get('days', 7)))
+                return {'ok': True, 'queue': [(subject, due.isoformat(), interval, easiness)
+                                              for subject, due, interval, easiness
+                                              in self.store.due_reviews(until, limit=100)],
+                        'untracked': sorted(self.store.untracked)}
+            
+            if cmd in ('track', 'untrack'):
+                self.store.set_tracked(request['subject'], cmd == 'track')
+                return {'ok': True, 'subject': request['subject'], 'tracked': cmd == 'track'}
+            
+            if cmd == 'review':
+                if not self.store.tracks(request['subject']):
+                    return {'ok': False, 'error': f"Reviews of {request['subject']} are off"}
+                quality = int(request['quality'])
+                if not 0 <= quality <= 5:
+                    return {'ok': False, 'error': "Quality must be between 0 and 5"}
+                result = self.store.record_review(request['subject'], day, quality)
+                if result is None:
+                    return {'ok': False, 'error': f"{request['subject']} was already reviewed"}
+                return {'ok': True, 'subject': request['subject'],
+                        'due': result[0].isoformat(), 'interval': result[1]}
+            
+            if cmd == 'toggle':
+                tasks = self.tasks_for(day)
+                index = int(request['index'])
+                if not 0 <= index < len(tasks):
+                    return {'ok': False, 'error': f"No task {index} on {day.isoformat()}"}
+                completed = not tasks[index].completed
+                self.store.set_completed(day, index, completed)
+                return {'ok': True, 'index': index, 'completed': completed}
+            
+            if cmd == 'edit':
+                tasks = []
+                for lineno, task, error in iter_task_lines(request.get('lines', [])):
+                    if error:
+                        return {'ok': False, 'error': f"line {lineno}: {error}"}
+                    tasks.append(task)
+                self.replace_tasks(day, tasks, request.get('template'))
+                return {'ok': True, 'date': day.isoformat(), 'count': len(tasks)}
+            
+            if cmd == 'plan':
+                started = time.perf_counter()
+                plan, unplaced = self.plan_week(request['spec'], day, request.get('dry_run', False))
+                return {'ok': True, 'seconds': time.perf_counter() - started,
+                        'plan': {day.isoformat(): [task.to_dict() for task in tasks]
+                                 for day, tasks in plan.items()},
+                        'unplaced': unplaced}
+            
+            if cmd == 'import' and calendar_format(request['path']):
+                start = time.perf_counter()
+                count, duplicates, errors = self.import_calendar_file(request['path'])
+                return {'ok': True, 'count': count, 'duplicates': duplicates,
+                        'errors': errors, 'seconds': time.perf_counter() - start}
+            
+            if cmd == 'export':
+                if not calendar_format(request['path']):
+                    return {'ok': False, 'error': "Export path must end in .ics or .csv"}
+                start = time.perf_counter()
+                first = request.get('start')
+                last = request.get('end')
+                count = self.export_calendar_file(
+                    request['path'], date.fromisoformat(first) if first else None,
+                    date.fromisoformat(last) if last else None)
+                return {'ok': True, 'exported': count, 'path': request['path'],
+                        'seconds': time.perf_counter() - start}
+            
+            if cmd == 'import':
+                start = time.perf_counter()
+                count, errors = self.import_tasks_file(day, request['path'])
+                return {'ok': True, 'date': day.isoformat(), 'count': count,
+                        'errors': errors, 'seconds': time.perf_counter() - start}
+            
+            return {'ok': False, 'error': f"Unknown command: {cmd}"}
+        except (KeyError, ValueError, TypeError) as e:
+            return {'ok': False, 'error': f"Bad request: {e}"}
+        except OSError as e:
+            return {'ok': False, 'error': str(e)}
+    
+    def close(self):
+        """Flush pending writes, cache the startup view and release the store"""
+        if self.reminders is not None:
+            self.reminders.stop()
+            self.reminders = None
+        if self.persistence is not None:
+            self.persistence.stop()
+            self.persistence = None
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+        if self.store is not None:
+            cache = self.build_view_cache()
+            self.store.close()
+            self.store = None
+            if cache is not None:
+                self.save_view_cache(cache)
+
+class StudyPlanner(PlannerCore):
+    def __init__(self, profiler=None, request=None, server=None, user=None, reminders=True):
+        self.profiler = profiler
+        if profiler:
+            profiler.mark("imports")
+        
+        # Hand the request to the running instance instead of starting a second one
+        try:
+            self.instance_lock = InstanceLock()
+        except PermissionError as e:
+            print(f"Error: {e}")
+            return
+        if not self.instance_lock.acquire():
+            self.forward_request(request or {'cmd': 'raise'})
+            return
+        
+        super().__init__()
+        self.profile_mark("load_schedule")
+        self.current_day = None  # Date shown in the window, not necessarily today
+        self.today = None  # Calendar date, follows midnight
+        self.day_tasks = []  # Tasks of current_day as stored in the schedule store
+        self.clock_job = None
+        self.clock_due = None
+        self.rollover_job = None
+        self.diagnostics_win = None
+        self.session = None
+        self.session_job = None
+        self.persist_job = None
+        self.task_widgets = {}  # Visible task index -> row widget
+        self.row_pool = []  # Recycled row widgets not bound to a task
+        self.editor_styles_ready = False
+        self.ipc_queue = queue.Queue()
+        self.request_server = None
+        self.sync = None  # ServerSync when a shared server is configured
+        self.reminder_queue = queue.Queue()
+        self.setup_gui()
+        self.start_request_server()
+        if server:
+            self.start_sync(server, user)
+        if reminders:
+            self.root.bind('<<Reminder>>', self.on_reminder)
+            # Planning two weeks of reminders waits until tasks are on screen
+            self.root.after_idle(self.start_reminders, self.notify_threadsafe)
+        if request:
+            self.root.after_idle(self.execute, request)
+    
+    def profile_mark(self, phase):
+        """Record a startup phase when --profile-startup is active"""
+        if self.profiler:
+            self.profiler.mark(phase)
+        
+    def forward_request(self, request):
+        """Send a request to the already running instance"""
+        try:
+            reply = send_request(default_socket_path(), request)
+        except OSError as e:
+            print(f"Study Planner is already running but not answering: {e}")
+            return
+        if not reply.get('ok'):
+            print(f"Study Planner is already running: {reply.get('error')}")
+        else:
+            print("Study Planner is already running, request forwarded")
+    
+    def start_request_server(self):
+        """Listen for requests from later launches and headless commands"""
+        try:
+            self.request_server = RequestServer(default_socket_path(), self.execute_threadsafe)
+        except OSError as e:
+            print(f"Could not open request socket: {e}")
+            return
+        self.root.bind('<<IPCRequest>>', self.on_ipc_request)
+        threading.Thread(target=self.request_server.serve_forever, daemon=True).start()
+    
+    def start_sync(self, server, user=None):
+        """Keep the shown day in sync with a shared planner server"""
+        client = ScheduleClient(server, user or getpass.getuser())
+        self.sync = ServerSync(client, self.on_remote_tasks)
+        self.sync.start()
+    
+    def on_remote_tasks(self, day, tasks):
+        """Apply a day changed on the server, called from the sync thread"""
+        self.execute_threadsafe({'cmd': 'remote', 'date': day.isoformat(), 'tasks': tasks})
+    
+    def publish_day(self, day):
+        """Upload the shown day's tasks when syncing with a server"""
+        if self.sync is not None:
+            self.sync.push(day, [task.to_dict() for task in self.day_tasks])
+    
+    def notify_threadsafe(self, title, message):
+        """Queue a reminder for the Tk thread, called from the reminder thread"""
+        desktop_notify(title, message)
+        self.reminder_queue.put((title, message))
+        try:
+            self.root.event_generate('<<Reminder>>', when='tail')
+        except RuntimeError:
+            pass  # Shown by the next reminder once mainloop runs
+    
+    def on_reminder(self, event=None):
+        """Show queued reminders as small windows that close themselves"""
+        while True:
+            try:
+                title, message = self.reminder_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.root.bell()
+            toast = tk.Toplevel(self.root)
+            toast.overrideredirect(True)
+            toast.attributes('-topmost', True)
+            toast.configure(bg='#3b3b3b')
+            tk.Label(toast, text=f"⏰ {title}", font=('Arial', 11, 'bold'), bg='#3b3b3b',
+                    fg='#ffffff', padx=12, pady=6).pack(anchor='w')
+            tk.Label(toast, text=message, font=('Arial', 10), bg='#3b3b3b', fg='#cccccc',
+                    padx=12).pack(anchor='w', pady=(0, 8))
+            toast.update_idletasks()
+            x = self.root.winfo_x() + self.root.winfo_width() - toast.winfo_reqwidth()
+            toast.geometry(f"+{max(x, 0)}+{self.root.winfo_y() + 10}")
+            toast.bind("<Button-1>", lambda e, toast=toast: toast.destroy())
+            self.root.after(15000, toast.destroy)
+    
+    def execute_threadsafe(self, request, timeout=5):
+        """Run a socket request on the Tk thread and wait for its reply"""
+        reply = []
+        done = threading.Event()
+        self.ipc_queue.put((request, reply, done))
+        try:
+            self.root.event_generate('<<IPCRequest>>', when='tail')
+        except RuntimeError:
+            # Tk refuses calls from other threads until mainloop runs
+            return {'ok': False, 'error': "The planner window is still starting"}
+        if not done.wait(timeout):
+            return {'ok': False, 'error': "Timed out waiting for the planner window"}
+        return reply[0]
+    
+    def on_ipc_request(self, event=None):
+        """Drain queued socket requests on the Tk thread"""
+        while True:
+            try:
+                request, reply, done = self.ipc_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                reply.append(self.execute(request))
+            except Exception as e:
+                reply.append({'ok': False, 'error': str(e)})
+            done.set()
+    
+    def execute(self, request):
+        """Handle requests from the socket, keeping the window in sync"""
+        cmd = request.get('cmd')
+        if cmd == 'raise':
+            self.root.deiconify()
+            self.root.lift()
+            self.root.focus_force()
+            return {'ok': True}
+        
+        if cmd == 'remote':
+            day = date.fromisoformat(request['date'])
+            self.store.replace_day(day, [Task.from_dict(task) for task in request['tasks']])
+            self.reschedule_reminders(day)
+            if day == self.current_day:
+                self.update_display()
+            return {'ok': True}
+        
+        shown_day = self.current_day.isoformat() if self.current_day else None
+        on_current_day = (request.get('date') or date.today().isoformat()) == shown_day
+        if cmd == 'toggle' and on_current_day and self.current_day is not None:
+            index = int(request.get('index', -1))
+            if not 0 <= index < len(self.day_tasks):
+                return {'ok': False, 'error': f"No task {index} today"}
+            self.toggle_task(index)
+            return {'ok': True, 'index': index, 'completed': self.day_tasks[index].completed}
+        
+        reply = super().execute(request)
+        if reply.get('ok') and cmd == 'plan' and not request.get('dry_run'):
+            self.update_display()
+        elif reply.get('ok') and cmd in ('edit', 'import') and (on_current_day or 'duplicates' in reply):
+            self.update_display()
+            self.publish_day(self.current_day)
+        return reply
     
     def setup_gui(self):
         """Setup the main GUI"""
+        import_tk()
+        self.profile_mark("tkinter import")
         self.root = tk.Tk()
         self.root.title("Study Planner")
         self.root.geometry("450x650+100+100")
@@ -146,15 +2692,37 @@ class StudyPlanner:
         # Make sure we clean up on exit
         self.root.protocol("WM_DELETE_WINDOW", self.safe_exit)
         
-        # Create lock file
-        self.create_lock_file()
-        
         # Configure styles for prettier buttons
         self.configure_styles()
+        self.profile_mark("style setup")
         
         self.create_widgets()
+        self.root.bind('<<TasksChanged>>', self.on_tasks_changed)
+        self.root.bind('<F12>', self.toggle_diagnostics)
+        self.root.bind('<Alt-Left>', lambda e: self.shift_day(-1))
+        self.root.bind('<Alt-Right>', lambda e: self.shift_day(1))
+        self.root.bind('<Alt-Prior>', lambda e: self.shift_day(-7))
+        self.root.bind('<Alt-Next>', lambda e: self.shift_day(7))
+        self.root.bind('<Alt-Home>', lambda e: self.show_day(date.today()))
+        self.tick_clock()
+        self.profile_mark("widget creation")
+        
+        # Let the empty window skeleton paint before tasks are populated
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Populate tasks once the window skeleton is on screen"""
+        self.root.update_idletasks()
+        self.profile_mark("first paint")
         self.update_display()
-        
+        # Everything after the first paint reads the store
+        self.startup_view = None
+        if self.profiler:
+            self.root.update_idletasks()
+            self.profiler.mark("populate tasks")
+            self.profiler.report()
+            self.profiler = None
+    
     def configure_styles(self):
         """Configure ttk styles for better looking buttons"""
         style = ttk.Style()
@@ -173,13 +2741,6 @@ class StudyPlanner:
                  background=[('active', '#5a7bbf'), ('pressed', '#3a5b9f')],
                  relief=[('pressed', 'sunken'), ('!pressed', 'raised')])
         
-        style.configure('Success.TButton',
-                       background='#2e7d32',
-                       foreground='white')
-        
-        style.map('Success.TButton',
-                 background=[('active', '#3e8d42'), ('pressed', '#1e6d22')])
-        
         style.configure('Danger.TButton',
                        background='#c62828',
                        foreground='white')
@@ -187,6 +2748,11 @@ class StudyPlanner:
         style.map('Danger.TButton',
                  background=[('active', '#d63838'), ('pressed', '#b61818')])
         
+        # Small buttons of the day navigator
+        style.configure('Nav.TButton',
+                       font=('Arial', 9, 'bold'),
+                       padding=(4, 1))
+        
         # Configure progress bar style
         style.configure("Custom.Horizontal.TProgressbar",
                        background='#4a6baf',
@@ -195,6 +2761,20 @@ class StudyPlanner:
                        lightcolor='#4a6baf',
                        darkcolor='#4a6baf')
     
+    def configure_editor_styles(self):
+        """Configure styles only the task editor uses, on first open"""
+        if self.editor_styles_ready:
+            return
+        style = ttk.Style()
+        
+        style.configure('Success.TButton',
+                       background='#2e7d32',
+                       foreground='white')
+        
+        style.map('Success.TButton',
+                 background=[('active', '#3e8d42'), ('pressed', '#1e6d22')])
+        self.editor_styles_ready = True
+    
     def create_widgets(self):
         """Create GUI widgets"""
         # Main frame
@@ -237,6 +2817,11 @@ class StudyPlanner:
                                        style="Custom.Horizontal.TProgressbar")
         self.progress.pack(fill='x', pady=5)
         
+        # Persistence status (pending writes / last flush latency)
+        self.persist_label = tk.Label(progress_section, font=('Arial', 8),
+                                     bg='#2b2b2b', fg='#666666')
+        self.persist_label.pack(anchor='e')
+        
         # Tasks section
         tasks_section = tk.Frame(main_frame, bg='#2b2b2b')
         tasks_section.pack(fill='both', expand=True, pady=10)
@@ -245,28 +2830,62 @@ class StudyPlanner:
         tasks_header = tk.Frame(tasks_section, bg='#3b3b3b', relief='raised', bd=1)
         tasks_header.pack(fill='x', pady=(0, 8))
         
-        tk.Label(tasks_header, text="Today's Tasks", font=('Arial', 12, 'bold'), 
-                bg='#3b3b3b', fg='#ffffff', padx=10, pady=8).pack()
+        # Day navigator: previous/next week and day around the shown date
+        nav_frame = tk.Frame(tasks_header, bg='#3b3b3b')
+        nav_frame.pack(fill='x', padx=5, pady=(6, 2))
+        for text, days in (("«", -7), ("‹", -1)):
+            ttk.Button(nav_frame, text=text, width=2, style='Nav.TButton',
+                      command=lambda days=days: self.shift_day(days)).pack(side='left', padx=1)
+        for text, days in (("»", 7), ("›", 1)):
+            ttk.Button(nav_frame, text=text, width=2, style='Nav.TButton',
+                      command=lambda days=days: self.shift_day(days)).pack(side='right', padx=1)
+        
+        self.tasks_title = tk.Label(nav_frame, text="Today's Tasks", font=('Arial', 12, 'bold'),
+                                   bg='#3b3b3b', fg='#ffffff', cursor="hand2")
+        self.tasks_title.pack(side='left', fill='x', expand=True)
+        self.tasks_title.bind("<Button-1>", lambda e: self.show_day(date.today()))
+        
+        # Week strip, one cell per day with its completion
+        week_frame = tk.Frame(tasks_header, bg='#3b3b3b')
+        week_frame.pack(fill='x', padx=5, pady=(0, 6))
+        self.week_cells = []
+        for offset in range(7):
+            cell = tk.Label(week_frame, font=('Arial', 8), bg='#333333', fg='#cccccc',
+                           cursor="hand2", pady=2)
+            cell.pack(side='left', fill='x', expand=True, padx=1)
+            cell.bind("<Button-1>", lambda e, offset=offset: self.show_week_cell(offset))
+            self.week_cells.append(cell)
+        
+        # Study session bar, only packed while a session exists
+        self.session_frame = tk.Frame(tasks_section, bg='#3b3b3b', relief='raised', bd=1)
+        self.session_label = tk.Label(self.session_frame, font=('Arial', 10, 'bold'),
+                                     bg='#3b3b3b', fg='#88ccff', anchor='w')
+        self.session_label.pack(side='left', fill='x', expand=True, padx=8, pady=6)
+        ttk.Button(self.session_frame, text="⏹", width=3, command=self.stop_session,
+                  style='Danger.TButton').pack(side='right', padx=(0, 5), pady=4)
+        self.pause_button = ttk.Button(self.session_frame, text="⏸", width=3,
+                                      command=self.pause_session, style='Modern.TButton')
+        self.pause_button.pack(side='right', padx=5, pady=4)
+        self.session_anchor = tasks_header
         
         # Tasks container with scrollbar
         tasks_container_frame = tk.Frame(tasks_section, bg='#2b2b2b')
         tasks_container_frame.pack(fill='both', expand=True)
         
-        # Create a canvas and scrollbar for tasks
+        # Create a canvas and scrollbar for tasks, rows are placed on it lazily
         self.canvas = tk.Canvas(tasks_container_frame, bg='#2b2b2b', highlightthickness=0)
-        scrollbar = ttk.Scrollbar(tasks_container_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg='#2b2b2b')
+        self.scrollbar = ttk.Scrollbar(tasks_container_frame, orient="vertical", command=self.canvas.yview)
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        # Every view change goes through yscrollcommand, so render from there
+        self.canvas.configure(yscrollcommand=self.on_tasks_scrolled)
+        self.canvas.bind("<Configure>", self.on_canvas_resized)
         
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.empty_label_id = self.canvas.create_text(
+            10, 30, anchor='w', state='hidden', fill='#888888', font=('Arial', 11),
+            text="🎉 No tasks for today! Enjoy your free time!")
         
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
         
         # Control buttons frame
         control_frame = tk.Frame(main_frame, bg='#2b2b2b')
@@ -286,41 +2905,145 @@ class StudyPlanner:
                                 command=self.update_display, style='Modern.TButton')
         refresh_btn.pack(side='left', padx=(0, 10), fill='x', expand=True)
         
+        # Analytics button
+        stats_btn = ttk.Button(button_container, text="📊 Stats",
+                              command=self.show_analytics, style='Modern.TButton')
+        stats_btn.pack(side='left', padx=(0, 10), fill='x', expand=True)
+        
         # Exit button
         exit_btn = ttk.Button(button_container, text="🚪 Exit", 
                              command=self.safe_exit, style='Danger.TButton')
         exit_btn.pack(side='left', fill='x', expand=True)
         
         # Store the tasks container reference
-        self.tasks_container = self.scrollable_frame
+        self.tasks_container = self.canvas
     
     def update_display(self):
-        """Update the display with current information"""
-        # Update time
+        """Reload the shown day from the store, reconciling rows in place"""
+        if self.today is None:
+            self.on_day_changed()
+        self.show_day(self.current_day or self.today)
+    
+    def show_day(self, day):
+        """Show any date; unchanged rows survive navigation and saves"""
+        moved = day != self.current_day
+        self.current_day = day
+        if day == self.today:
+            title = "Today's Tasks"
+        else:
+            title = f"Tasks for {day.strftime('%a, %b %d %Y')}"
+        self.tasks_title.config(text=title, fg='#ffffff' if day == self.today else '#ffcc80')
+        self.update_tasks_display(day, scroll_to_top=moved)
+        self.on_tasks_changed()
+        if self.sync is not None and moved:
+            self.sync.watch(day, [task.to_dict() for task in self.day_tasks])
+    
+    def shift_day(self, days):
+        """Move the view by a number of days"""
+        self.show_day((self.current_day or date.today()) + timedelta(days=days))
+    
+    def week_start(self):
+        """Monday of the shown week"""
+        return self.current_day - timedelta(days=self.current_day.weekday())
+    
+    def show_week_cell(self, offset):
+        """Show a day clicked in the week strip"""
+        self.show_day(self.week_start() + timedelta(days=offset))
+    
+    def update_week_strip(self):
+        """Show the shown week with per-day completion from the aggregates"""
+        start = self.week_start()
+        if self.startup_view is not None and self.startup_view['week_start'] == start.isoformat():
+            progress = {date.fromisoformat(day): tuple(counts)
+                        for day, counts in self.startup_view['week'].items()}
+        else:
+            progress = self.store.daily_progress(start, start + timedelta(days=6))
+        for offset, cell in enumerate(self.week_cells):
+            day = start + timedelta(days=offset)
+            completed, total = progress.get(day, (0, 0))
+            counts = f"{completed}/{total}" if total else "–"
+            if total and completed == total:
+                fg = '#4CAF50'
+            else:
+                fg = '#88ccff' if day == self.today else '#cccccc'
+            cell.config(text=f"{day.strftime('%a')} {day.day}\n{counts}", fg=fg,
+                        bg='#4a6baf' if day == self.current_day else '#333333')
+    
+    def view_tasks(self, day):
+        """Tasks to show for a date
+        
+        Today is stored from the weekday template as before. Future dates only
+        preview the template until a task is toggled, and past dates show what
+        was stored, so browsing never writes history.
+        """
+        if day == date.today():
+            if self.startup_view is not None:
+                return [Task(*fields) for fields in self.startup_view['today']]
+            return self.tasks_for(day)
+        return self.planned_tasks(day)
+    
+    def tick_clock(self):
+        """Update the clock label, aligned to the next full second"""
+        if self.clock_due is not None:
+            INSTRUMENTS.lateness('after:tick_clock', self.clock_due)
         current_time = datetime.now()
-        time_str = current_time.strftime("%H:%M:%S")
-        date_str = current_time.strftime("%A, %B %d")
-        day_name = current_time.strftime("%A")
-        
-        self.time_label.config(text=time_str)
-        self.day_label.config(text=f"{date_str}")
+        self.time_label.config(text=current_time.strftime("%H:%M:%S"))
         
-        # Only update tasks if day changed or first run
-        if day_name != self.current_day:
-            self.current_day = day_name
-            self.update_tasks_display(day_name)
+        # Safety net for suspend/resume or clock changes delaying the midnight timer
+        if self.today is not None and current_time.date() != self.today:
+            self.on_day_changed()
         
-        # Update progress (always update this)
-        self.update_progress(day_name)
-        
-        # Schedule next update
-        self.root.after(1000, self.update_display)
+        delay = 1000 - current_time.microsecond // 1000
+        self.clock_due = time.perf_counter() + delay / 1000
+        self.clock_job = self.root.after(delay, self.tick_clock)
+    
+    def on_day_changed(self):
+        """Track the calendar date and arm a single timer for the next midnight"""
+        current_time = datetime.now()
+        today = current_time.date()
+        self.day_label.config(text=current_time.strftime("%A, %B %d"))
+        
+        if today != self.today:
+            previous, self.today = self.today, today
+            # Follow midnight only if the window was showing today
+            if self.current_day is not None:
+                self.show_day(today if self.current_day == previous else self.current_day)
+        
+        if self.rollover_job is not None:
+            self.root.after_cancel(self.rollover_job)
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        delay = int((midnight - current_time).total_seconds() * 1000) + 1
+        self.rollover_job = self.root.after(delay, self.on_day_changed)
     
-    def update_progress(self, day_name):
+    def on_tasks_changed(self, event=None):
+        """Recompute progress after a task change event"""
+        self.update_progress(self.current_day)
+        self.update_week_strip()
+        self.update_persist_status()
+        
+        # Refresh the write counters once more after the worker had time to flush
+        if self.persist_job is not None:
+            self.root.after_cancel(self.persist_job)
+        delay = int(PERSIST_COALESCE_WINDOW * 1000) + 100
+        self.persist_job = self.root.after(delay, self.update_persist_status)
+    
+    def update_persist_status(self):
+        """Show pending writes and last flush latency"""
+        self.persist_job = None
+        pending, latency, commit = self.persistence_stats()
+        self.persist_label.config(text=f"Pending writes: {pending} | Last flush: {latency:.1f} ms"
+                                       f" | Last commit: {commit:.1f} ms")
+    
+    @INSTRUMENTS.timed('update_progress')
+    def update_progress(self, day):
         """Update progress bar without affecting tasks display"""
-        tasks = self.schedule.get(day_name, [])
-        completed = sum(1 for task in tasks if task.get('completed', False))
-        total = len(tasks)
+        if self.startup_view is not None and day == date.today():
+            completed, total = self.startup_view['progress']
+        else:
+            completed, total = self.store.progress(day)
+        if not total and self.day_tasks:
+            # A previewed future day is not stored yet
+            completed, total = sum(task.completed for task in self.day_tasks), len(self.day_tasks)
         
         progress_text = f"Progress: {completed}/{total} tasks completed"
         self.progress_label.config(text=progress_text)
@@ -331,98 +3054,179 @@ class StudyPlanner:
         else:
             self.progress['value'] = 0
     
-    def update_tasks_display(self, day_name):
-        """Update the tasks display only when day changes"""
-        # Clear existing task widgets
-        for widget in self.tasks_container.winfo_children():
-            widget.destroy()
-        
-        self.task_widgets.clear()
-        
-        tasks = self.schedule.get(day_name, [])
-        
-        if not tasks:
-            no_tasks_label = tk.Label(self.tasks_container, text="🎉 No tasks for today! Enjoy your free time!",
-                                     font=('Arial', 11), bg='#2b2b2b', fg='#888888', pady=20)
-            no_tasks_label.pack(fill='x', pady=10)
-            return
-        
-        # Create task widgets
-        for i, task in enumerate(tasks):
-            self.create_task_widget(i, task)
+    @INSTRUMENTS.timed('update_tasks_display')
+    def update_tasks_display(self, day, scroll_to_top=True):
+        """Show the tasks of a date, touching only the rows whose task changed"""
+        tasks = self.view_tasks(day)
+        self.reconcile_rows(self.day_tasks, tasks)
+        self.day_tasks = tasks
+        
+        if day == date.today():
+            empty_text = "🎉 No tasks for today! Enjoy your free time!"
+        else:
+            empty_text = "No tasks on this day"
+        self.canvas.itemconfigure(self.empty_label_id, text=empty_text,
+                                  state='hidden' if tasks else 'normal')
+        self.canvas.configure(scrollregion=(0, 0, 0, len(tasks) * TASK_ROW_HEIGHT))
+        if scroll_to_top:
+            self.canvas.yview_moveto(0)
+        self.render_visible_tasks()
+    
+    def reconcile_rows(self, old, new):
+        """Diff two task lists and update only the materialized rows that differ
+        
+        Rows of the common prefix are left alone, rows of the common suffix are
+        moved to their new index without being refilled, rows in the changed
+        middle are refilled and rows past the end go back to the pool.
+        """
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        shift = len(new) - len(old)
+        
+        rows, self.task_widgets = self.task_widgets, {}
+        for index, task_frame in rows.items():
+            if index < prefix:
+                self.task_widgets[index] = task_frame
+            elif index >= len(old) - suffix:
+                index += shift
+                task_frame.task_index = index
+                self.canvas.coords(task_frame.window_id, 2, index * TASK_ROW_HEIGHT + 3)
+                self.task_widgets[index] = task_frame
+            elif index < len(new) - suffix:
+                self.fill_task_widget(task_frame, new[index])
+                self.task_widgets[index] = task_frame
+            else:
+                self.canvas.itemconfigure(task_frame.window_id, state='hidden')
+                self.row_pool.append(task_frame)
+    
+    def on_tasks_scrolled(self, first, last):
+        """Keep the scrollbar in sync and materialize newly visible rows"""
+        self.scrollbar.set(first, last)
+        self.render_visible_tasks()
+    
+    def on_canvas_resized(self, event):
+        """Stretch rows to the canvas width and fill a taller viewport"""
+        for task_frame in list(self.task_widgets.values()) + self.row_pool:
+            self.canvas.itemconfigure(task_frame.window_id, width=event.width - 4)
+        self.render_visible_tasks()
+    
+    def render_visible_tasks(self):
+        """Bind row widgets only to the tasks inside the viewport"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // TASK_ROW_HEIGHT) - TASK_ROW_OVERSCAN)
+        last = min(len(self.day_tasks), int(bottom // TASK_ROW_HEIGHT) + 1 + TASK_ROW_OVERSCAN)
+        
+        for index in [i for i in self.task_widgets if not first <= i < last]:
+            self.release_task_widget(index)
+        
+        for index in range(first, last):
+            if index not in self.task_widgets:
+                self.create_task_widget(index, self.day_tasks[index])
+    
+    def release_task_widget(self, index):
+        """Hide a row and put it back into the pool"""
+        task_frame = self.task_widgets.pop(index)
+        self.canvas.itemconfigure(task_frame.window_id, state='hidden')
+        self.row_pool.append(task_frame)
     
+    @INSTRUMENTS.timed('create_task_widget')
     def create_task_widget(self, index, task):
-        """Create a stable widget for a single task"""
-        task_frame = tk.Frame(self.tasks_container, bg='#3b3b3b', relief='raised', bd=1)
-        task_frame.pack(fill='x', pady=3, padx=2)
+        """Show a task in a recycled row, building a new row only if the pool is empty"""
+        if self.row_pool:
+            task_frame = self.row_pool.pop()
+        else:
+            task_frame = self.build_task_row()
+        
+        task_frame.task_index = index
+        self.canvas.coords(task_frame.window_id, 2, index * TASK_ROW_HEIGHT + 3)
+        self.canvas.itemconfigure(task_frame.window_id, state='normal')
+        self.fill_task_widget(task_frame, task)
         
         # Store reference
         self.task_widgets[index] = task_frame
-        
-        # Completion checkbox with better styling
-        is_completed = task.get('completed', False)
-        var = tk.BooleanVar(value=is_completed)
+    
+    def build_task_row(self):
+        """Create the widgets of one reusable task row"""
+        task_frame = tk.Frame(self.canvas, bg='#3b3b3b', relief='raised', bd=1)
+        task_frame.pack_propagate(False)
+        task_frame.window_id = self.canvas.create_window(
+            2, 0, window=task_frame, anchor='nw', state='hidden',
+            width=max(self.canvas.winfo_width() - 4, 1), height=TASK_ROW_HEIGHT - 6)
         
         # Custom checkbox using Label for better appearance
-        check_label = tk.Label(task_frame, text="✓" if is_completed else "○", 
-                              font=('Arial', 14), bg='#3b3b3b', 
-                              fg='#4CAF50' if is_completed else '#666666',
-                              cursor="hand2")
+        check_label = tk.Label(task_frame, font=('Arial', 14), bg='#3b3b3b', cursor="hand2")
         check_label.pack(side='left', padx=8)
-        check_label.var = var
-        check_label.task_index = index
-        check_label.bind("<Button-1>", lambda e, idx=index: self.toggle_task(idx))
+        check_label.bind("<Button-1>", lambda e: self.toggle_task(task_frame.task_index))
         
-        # Task info with better formatting
-        task_text = f"{task['time']} - {task['subject']} ({task['duration']})"
-        color = '#888888' if is_completed else '#ffffff'
-        font_style = ('Arial', 10, 'overstrike' if is_completed else 'normal')
+        # Starts a study session on this task
+        timer_label = tk.Label(task_frame, text="⏱", font=('Arial', 12), bg='#3b3b3b',
+                              fg='#88ccff', cursor="hand2")
+        timer_label.pack(side='right', padx=8)
+        timer_label.bind("<Button-1>", lambda e: self.start_session(task_frame.task_index))
         
-        task_label = tk.Label(task_frame, text=task_text, font=font_style,
-                             bg='#3b3b3b', fg=color, anchor='w', justify='left')
+        task_label = tk.Label(task_frame, bg='#3b3b3b', anchor='w', justify='left')
         task_label.pack(side='left', fill='x', expand=True, padx=5)
         
         # Store references for updating
         task_frame.check_label = check_label
         task_frame.task_label = task_label
+        return task_frame
+    
+    def fill_task_widget(self, task_frame, task):
+        """Render a task's state into a row"""
+        is_completed = task.completed
+        
+        # Update checkbox
+        task_frame.check_label.config(
+            text="✓" if is_completed else "○",
+            fg='#4CAF50' if is_completed else '#666666'
+        )
+        
+        # Task info with better formatting
+        task_text = f"{task.time} - {task.subject} ({task.duration})"
+        color = '#888888' if is_completed else '#ffffff'
+        font_style = ('Arial', 10, 'overstrike' if is_completed else 'normal')
+        
+        task_frame.task_label.config(
+            text=task_text,
+            fg=color,
+            font=font_style
+        )
     
+    @INSTRUMENTS.timed('toggle_task')
     def toggle_task(self, task_index):
         """Toggle task completion status with smooth update"""
-        day_name = datetime.now().strftime("%A")
-        if day_name in self.schedule and 0 <= task_index < len(self.schedule[day_name]):
+        day = self.current_day
+        if 0 <= task_index < len(self.day_tasks):
+            if day > date.today() and not self.store.has_day(day):
+                self.tasks_for(day)  # Store the previewed template before changing it
+            task = self.day_tasks[task_index]
             # Toggle completion status
-            current = self.schedule[day_name][task_index]['completed']
-            self.schedule[day_name][task_index]['completed'] = not current
+            current = task.completed
+            task.completed = not current
+            # A one-row WAL commit, so it stays on the UI thread where progress reads it back
+            self.store.set_completed(day, task_index, not current)
             
-            # Update the specific task widget without redrawing everything
+            # Update the specific task widget without redrawing everything,
+            # rows scrolled out of view pick up the new state when shown again
             if task_index in self.task_widgets:
-                task_frame = self.task_widgets[task_index]
-                is_completed = not current
-                
-                # Update checkbox
-                task_frame.check_label.config(
-                    text="✓" if is_completed else "○",
-                    fg='#4CAF50' if is_completed else '#666666'
-                )
-                
-                # Update task text
-                task_text = f"{self.schedule[day_name][task_index]['time']} - {self.schedule[day_name][task_index]['subject']} ({self.schedule[day_name][task_index]['duration']})"
-                color = '#888888' if is_completed else '#ffffff'
-                font_style = ('Arial', 10, 'overstrike' if is_completed else 'normal')
-                
-                task_frame.task_label.config(
-                    text=task_text,
-                    fg=color,
-                    font=font_style
-                )
+                self.fill_task_widget(self.task_widgets[task_index], task)
+            self.publish_day(day)
             
-            self.save_schedule()
-            self.update_progress(day_name)  # Only update progress, not entire display
+            self.root.event_generate('<<TasksChanged>>')  # Only update progress, not entire display
     
     def edit_tasks(self):
         """Open simple task editor"""
-        day_name = datetime.now().strftime("%A")
-        tasks = self.schedule.get(day_name, [])
+        day = self.current_day
+        day_name = day.strftime("%A, %B %d")
+        tasks = self.day_tasks
+        self.configure_editor_styles()
         
         # Create simple edit window
         edit_win = tk.Toplevel(self.root)
@@ -456,48 +3260,93 @@ class StudyPlanner:
         
         # Populate with current tasks
         for task in tasks:
-            status = "[✓]" if task['completed'] else "[○]"
-            text_area.insert('end', 
-                           f"{status} {task['time']} | {task['subject']} | {task['duration']}\n")
+            text_area.insert('end', format_task_line(task) + "\n")
+        
+        # Invalid lines are highlighted as they are edited
+        text_area.tag_configure('error', background='#5c1f1f')
+        status_label = tk.Label(edit_win, font=('Arial', 9), bg='#2b2b2b',
+                               fg='#ff8a80', anchor='w')
+        status_label.pack(fill='x', padx=10)
+        text_area.edit_modified(False)
+        last_insert_line = [1]
+        
+        def validate_lines(first, last):
+            """Re-tag only the given line range"""
+            message = None
+            for lineno in range(first, last + 1):
+                line_start, line_end = f"{lineno}.0", f"{lineno}.end"
+                text_area.tag_remove('error', line_start, line_end)
+                try:
+                    parse_task_line(text_area.get(line_start, line_end))
+                except TaskLineError as e:
+                    text_area.tag_add('error', line_start, line_end)
+                    message = f"Line {lineno}: {e}"
+            error_count = len(text_area.tag_ranges('error')) // 2
+            if message is None and error_count:
+                message = f"{error_count} invalid line(s)"
+            status_label.config(text=message or "")
+        
+        def on_modified(event):
+            """Revalidate the lines between the previous and current cursor line"""
+            if not text_area.edit_modified():
+                return
+            current_line = int(text_area.index('insert').split('.')[0])
+            last_line = int(text_area.index('end-1c').split('.')[0])
+            first = min(last_insert_line[0], current_line)
+            last = min(max(last_insert_line[0], current_line), last_line)
+            validate_lines(first, last)
+            last_insert_line[0] = current_line
+            text_area.edit_modified(False)
+        
+        def on_cursor_moved(event):
+            last_insert_line[0] = int(text_area.index('insert').split('.')[0])
+        
+        text_area.bind('<<Modified>>', on_modified)
+        text_area.bind('<ButtonRelease-1>', on_cursor_moved, add='+')
+        text_area.bind('<KeyRelease-Up>', on_cursor_moved, add='+')
+        text_area.bind('<KeyRelease-Down>', on_cursor_moved, add='+')
         
         # Button frame
         button_frame = tk.Frame(edit_win, bg='#2b2b2b')
         button_frame.pack(fill='x', pady=10)
         
+        # Today's edits carry over to later weeks unless unticked, other dates only if ticked
+        every_weekday = tk.BooleanVar(value=day == date.today())
+        if day >= date.today():
+            tk.Checkbutton(button_frame, text=f"Apply to every {day.strftime('%A')}",
+                           variable=every_weekday, bg='#2b2b2b', fg='white',
+                           selectcolor='#3b3b3b', activebackground='#2b2b2b',
+                           activeforeground='white').pack(side='left', padx=5)
+        
         def save_changes():
             try:
-                # Simple parsing of changes
                 content = text_area.get('1.0', 'end-1c')
                 new_tasks = []
+                errors = []
+                for lineno, task, error in iter_task_lines(content.splitlines()):
+                    if error:
+                        errors.append(lineno)
+                        text_area.tag_add('error', f"{lineno}.0", f"{lineno}.end")
+                    else:
+                        new_tasks.append(task)
                 
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line and '|' in line:
-                        parts = line.split('|')
-                        if len(parts) >= 3:
-                            status_part = parts[0].strip()
-                            time_part = parts[1].strip()
-                            subject_part = parts[2].strip()
-                            duration_part = parts[3].strip() if len(parts) > 3 else "1h"
-                            
-                            completed = '✓' in status_part
-                            
-                            new_tasks.append({
-                                'time': time_part,
-                                'subject': subject_part,
-                                'duration': duration_part,
-                                'completed': completed
-                            })
+                # Never drop malformed lines silently
+                if errors:
+                    text_area.see(f"{errors[0]}.0")
+                    lines = ", ".join(map(str, errors[:10]))
+                    import_messagebox().showerror(
+                        "Invalid lines", f"Please fix the highlighted lines: {lines}",
+                        parent=edit_win)
+                    return
                 
-                self.schedule[day_name] = new_tasks
-                self.save_schedule()
-                self.current_day = None  # Force refresh of tasks display
+                self.replace_tasks(day, new_tasks, every_weekday.get())
                 self.update_display()
+                self.publish_day(day)
                 edit_win.destroy()
-                messagebox.showinfo("Success", "Tasks updated successfully!")
+                import_messagebox().showinfo("Success", "Tasks updated successfully!")
                 
             except Exception as e:
-                messagebox.showerror("Error", f"Could not save changes: {e}")
+                import_messagebox().showerror("Error", f"Could not save changes: {e}")
         
         # Save button with modern style
         save_btn = ttk.Button(button_frame, text="💾 Save Changes", 
@@ -509,12 +3358,195 @@ class StudyPlanner:
                                command=edit_win.destroy, style='Danger.TButton')
         cancel_btn.pack(side='right', padx=5)
     
+    def show_analytics(self):
+        """Chart planned vs studied hours per week from the precomputed aggregates"""
+        end = date.today()
+        start = end - timedelta(weeks=ANALYTICS_WEEKS)
+        weeks = self.store.weekly_totals(start, end)
+        subjects = self.store.subject_totals(start, end)
+        
+        stats_win = tk.Toplevel(self.root)
+        stats_win.title("Study Analytics")
+        stats_win.geometry("600x480")
+        stats_win.configure(bg='#2b2b2b')
+        stats_win.transient(self.root)
+        
+        header_frame = tk.Frame(stats_win, bg='#3b3b3b', relief='raised', bd=1)
+        header_frame.pack(fill='x', pady=(0, 10))
+        tk.Label(header_frame, text=f"📊 Hours per week since {start.strftime('%B %d')}",
+                font=('Arial', 12, 'bold'), bg='#3b3b3b', fg='white',
+                padx=10, pady=8).pack()
+        
+        # Bar chart: planned hours behind studied hours
+        chart = tk.Canvas(stats_win, height=240, bg='#2b2b2b', highlightthickness=0)
+        chart.pack(fill='x', padx=10)
+        chart_width, chart_height, baseline = 580, 240, 220
+        peak = max([planned for _, planned, _ in weeks] + [60])
+        slot = chart_width / max(len(weeks), 1)
+        for i, (week, planned, done) in enumerate(weeks):
+            x0 = i * slot + slot * 0.15
+            x1 = (i + 1) * slot - slot * 0.15
+            chart.create_rectangle(x0, baseline - planned / peak * 200, x1, baseline,
+                                   fill='#3b3b3b', outline='')
+            chart.create_rectangle(x0, baseline - done / peak * 200, x1, baseline,
+                                   fill='#4a6baf', outline='')
+            chart.create_text((x0 + x1) / 2, baseline + 10, text=week.strftime('%d/%m'),
+                              fill='#888888', font=('Arial', 7))
+        chart.create_text(chart_width - 5, 8, anchor='ne', fill='#cccccc', font=('Arial', 8),
+                          text=f"max {peak / 60:.1f}h  ■ studied  □ planned")
+        if not weeks:
+            chart.create_text(chart_width / 2, chart_height / 2, text="No history yet",
+                              fill='#888888', font=('Arial', 11))
+        
+        # Per-subject totals
+        subjects_frame = tk.Frame(stats_win, bg='#2b2b2b')
+        subjects_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        for subject, planned, done in subjects[:8]:
+            tk.Label(subjects_frame, text=f"{subject}: {done / 60:.1f}h of {planned / 60:.1f}h",
+                    font=('Arial', 10), bg='#2b2b2b', fg='#ffffff', anchor='w').pack(fill='x')
+    
+    def start_session(self, task_index):
+        """Start a pomodoro session on a task, ending any running one"""
+        if not 0 <= task_index < len(self.day_tasks):
+            return
+        if self.session is not None:
+            self.stop_session()
+        self.session = StudySession(self.current_day, task_index, self.day_tasks[task_index])
+        self.session_frame.pack(fill='x', pady=(0, 8), after=self.session_anchor)
+        self.pause_button.config(text="⏸")
+        self.tick_session()
+    
+    def pause_session(self):
+        """Pause or resume the running session"""
+        if self.session is None:
+            return
+        if self.session.running:
+            self.session.pause()
+            self.pause_button.config(text="▶")
+        else:
+            self.session.resume()
+            self.pause_button.config(text="⏸")
+        self.tick_session()
+    
+    def stop_session(self):
+        """End the session and log the focus time against its task"""
+        session = self.session
+        if session is None:
+            return
+        self.session = None
+        if self.session_job is not None:
+            self.root.after_cancel(self.session_job)
+            self.session_job = None
+        self.session_frame.pack_forget()
+        
+        minutes = session.focus_minutes()
+        if minutes >= 1:
+            self.store.log_study(session.day, session.position, session.task.subject,
+                                 session.started_at, round(minutes, 1))
+    
+    def tick_session(self):
+        """Redraw the session bar; timers only run while a session is running"""
+        if self.session_job is not None:
+            self.root.after_cancel(self.session_job)
+            self.session_job = None
+        session = self.session
+        if session is None:
+            return
+        
+        remaining = session.remaining()
+        if remaining <= 0:
+            session.next_phase()
+            self.root.bell()
+            remaining = session.remaining()
+        
+        if session.logged_minutes is None:
+            session.logged_minutes = self.store.studied_minutes(session.day, session.position)
+        studied = session.logged_minutes + session.focus_minutes()
+        minutes, seconds = divmod(int(math.ceil(remaining)), 60)
+        phase = "Focus" if session.phase == 'focus' else "Break"
+        paused = " (paused)" if not session.running else ""
+        self.session_label.config(
+            text=f"{phase} {session.cycle}: {minutes:02d}:{seconds:02d}{paused} · "
+                 f"{session.task.subject} {format_duration(int(studied))} of {session.task.duration}")
+        
+        if session.running:
+            # Wake up when the displayed second changes, computed from the monotonic clock
+            delay = int((remaining - math.floor(remaining)) * 1000) or 1000
+            self.session_job = self.root.after(delay, self.tick_session)
+    
+    def toggle_diagnostics(self, event=None):
+        """Open or close the live diagnostics window (F12)"""
+        if self.diagnostics_win is not None:
+            self.diagnostics_win.destroy()
+            self.diagnostics_win = None
+            return
+        
+        diag_win = tk.Toplevel(self.root)
+        diag_win.title("Diagnostics")
+        diag_win.geometry("520x360")
+        diag_win.configure(bg='#2b2b2b')
+        diag_win.protocol("WM_DELETE_WINDOW", self.toggle_diagnostics)
+        diag_win.bind('<F12>', self.toggle_diagnostics)
+        self.diagnostics_win = diag_win
+        
+        table = tk.Label(diag_win, font=('Courier', 9), bg='#1b1b1b', fg='#cccccc',
+                        anchor='nw', justify='left', padx=8, pady=8)
+        table.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        button_frame = tk.Frame(diag_win, bg='#2b2b2b')
+        button_frame.pack(fill='x', pady=(0, 10))
+        
+        def export_trace():
+            from tkinter import filedialog
+            path = filedialog.asksaveasfilename(
+                parent=diag_win, defaultextension='.json',
+                initialfile='study_planner_trace.json', filetypes=[('Trace', '*.json')])
+            if path:
+                count = INSTRUMENTS.export_trace(path)
+                import_messagebox().showinfo(
+                    "Trace exported", f"{count} events written to {path}", parent=diag_win)
+        
+        ttk.Button(button_frame, text="💾 Export Trace", command=export_trace,
+                  style='Modern.TButton').pack(side='right', padx=5)
+        ttk.Button(button_frame, text="🔄 Reset", command=INSTRUMENTS.reset,
+                  style='Modern.TButton').pack(side='right', padx=5)
+        
+        def refresh():
+            # Only refreshes while the window is open
+            if self.diagnostics_win is not diag_win:
+                return
+            pending, latency, commit = self.persistence_stats()
+            lines = [f"{'span':<24}{'calls':>8}{'avg ms':>10}{'max ms':>10}"]
+            for name, count, average, peak in INSTRUMENTS.snapshot():
+                lines.append(f"{name:<24}{count:>8}{average:>10.2f}{peak:>10.2f}")
+            lines.append("")
+            lines.append(f"pending writes {pending}, last flush {latency:.1f} ms, "
+                         f"last store commit {commit:.1f} ms")
+            lines.append(f"rows materialized {len(self.task_widgets)}, pooled {len(self.row_pool)}")
+            table.config(text="\n".join(lines))
+            diag_win.after(500, refresh)
+        
+        refresh()
+    
     def safe_exit(self):
         """Safely exit the application"""
-        self.remove_lock_file()
+        self.stop_session()
+        self.shutdown()
         self.root.quit()
         self.root.destroy()
     
+    def shutdown(self):
+        """Stop serving requests, flush data and release the instance lock"""
+        if self.sync is not None:
+            self.sync.stop()
+            self.sync = None
+        if self.request_server is not None:
+            self.request_server.shutdown()
+            self.request_server.server_close()
+            self.request_server = None
+        self.close()
+        self.instance_lock.release()
+    
     def run(self):
         """Run the application"""
         if hasattr(self, 'root'):
@@ -523,20 +3555,221 @@ class StudyPlanner:
             except Exception as e:
                 print(f"Error: {e}")
             finally:
-                self.remove_lock_file()
+                self.shutdown()
+
+class HeadlessPlanner(PlannerCore):
+    """Planner without a GUI, driven by CLI subcommands or socket requests"""
+    
+    @staticmethod
+    def print_reminder(title, message):
+        """Daemon reminders go to the desktop when possible and always to stdout"""
+        desktop_notify(title, message)
+        print(f"[{datetime.now():%H:%M}] {title}: {message}", flush=True)
+    
+    def serve(self, socket_path, reminders=True):
+        """Answer requests on a Unix socket until interrupted"""
+        server = RequestServer(socket_path, self.execute)
+        if reminders:
+            self.start_reminders(self.print_reminder)
+        print(f"Study Planner daemon listening on {socket_path}")
+        
+        # Let SIGTERM unwind normally so pending writes are flushed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+def print_reply(reply):
+    """Print a headless reply in a human readable form"""
+    if not reply.get('ok'):
+        print(f"Error: {reply.get('error')}", file=sys.stderr)
+        return 1
+    if 'tasks' in reply:
+        for i, task in enumerate(reply['tasks']):
+            print(f"{i}  {format_task_line(Task.from_dict(task))}")
+    elif 'spans' in reply:
+        print(f"{'span':<24}{'calls':>8}{'avg ms':>10}{'max ms':>10}")
+        for name, count, average, peak in reply['spans']:
+            print(f"{name:<24}{count:>8}{average:>10.2f}{peak:>10.2f}")
+        if reply.get('reminders'):
+            print(f"Pending reminders: {reply['reminders']}")
+    elif 'plan' in reply:
+        for day, tasks in reply['plan'].items():
+            print(date.fromisoformat(day).strftime("%A %Y-%m-%d"))
+            for task in tasks:
+                print(f"   {format_task_line(Task.from_dict(task))}")
+        for subject, minutes in reply.get('unplaced', {}).items():
+            print(f"Not placed: {subject} {format_duration(minutes)}")
+        print(f"Planned in {reply['seconds'] * 1000:.0f} ms")
+    elif 'queue' in reply:
+        if not reply['queue']:
+            print("No reviews due")
+        for subject, due, interval, easiness in reply['queue']:
+            print(f"{due}  {subject}  (every {interval}d, easiness {easiness:.2f})")
+        if reply.get('untracked'):
+            print(f"Not reviewed: {', '.join(reply['untracked'])}")
+    elif 'tracked' in reply:
+        print(f"Reviews of {reply['subject']} turned {'on' if reply['tracked'] else 'off'}")
+    elif 'interval' in reply:
+        print(f"Next review of {reply['subject']} on {reply['due']} "
+              f"(in {reply['interval']} days)")
+    elif 'weeks' in reply:
+        for week, planned, done in reply['weeks']:
+            print(f"Week of {week}: {done / 60:.1f}h of {planned / 60:.1f}h")
+        for subject, planned, done in reply['subjects']:
+            print(f"  {subject}: {done / 60:.1f}h of {planned / 60:.1f}h")
+    elif 'total' in reply:
+        print(f"Progress: {reply['completed']}/{reply['total']} tasks completed")
+    elif 'duplicates' in reply or 'exported' in reply:
+        for error in reply.get('errors', []):
+            print(f"Skipped {error}", file=sys.stderr)
+        count = reply.get('count', reply.get('exported'))
+        rate = count / reply['seconds'] if reply['seconds'] > 0 else 0
+        if 'exported' in reply:
+            print(f"Exported {count} tasks to {reply['path']}", end='')
+        else:
+            print(f"Imported {count} events, {reply['duplicates']} duplicates skipped", end='')
+        print(f" in {reply['seconds']:.2f}s ({rate:,.0f} events/s)")
+    elif 'count' in reply:
+        for error in reply.get('errors', []):
+            print(f"Skipped {error}", file=sys.stderr)
+        took = f" in {reply['seconds']:.2f}s" if 'seconds' in reply else ""
+        print(f"Saved {reply['count']} tasks for {reply['date']}{took}")
+    else:
+        print("Completed" if reply['completed'] else "Not completed")
+    return 0
+
+def headless_main(argv):
+    """Entry point for scripted use without tkinter"""
+    parser = argparse.ArgumentParser(prog="plannerV1.8.py --headless",
+                                     description="Study Planner without a GUI")
+    parser.add_argument('--date', help="date to work on (YYYY-MM-DD), default today")
+    commands = parser.add_subparsers(dest='cmd', required=True)
+    commands.add_parser('list', help="list tasks")
+    commands.add_parser('progress', help="show completion progress")
+    commands.add_parser('diagnostics', help="hot path timings of the running instance")
+    stats = commands.add_parser('stats', help="weekly and per-subject study hours")
+    stats.add_argument('--weeks', type=int, default=ANALYTICS_WEEKS)
+    reviews = commands.add_parser('reviews', help="spaced repetition queue due within --days")
+    reviews.add_argument('--days', type=int, default=7)
+    review = commands.add_parser('review', help="rate a review of a subject from 0 (forgot) to 5")
+    review.add_argument('subject')
+    review.add_argument('quality', type=int)
+    for name, summary in (('track', "turn spaced repetition of a subject back on"),
+                          ('untrack', "stop reviewing a subject, e.g. a break or planning block")):
+        commands.add_parser(name, help=summary).add_argument('subject')
+    toggle = commands.add_parser('toggle', help="toggle a task by its list index")
+    toggle.add_argument('index', type=int)
+    edit = commands.add_parser('edit', help="replace tasks with editor lines read from stdin")
+    edit.add_argument('--every-weekday', action='store_true',
+                      help="also make them the template of that weekday (the default for today)")
+    plan = commands.add_parser('plan', help="optimize the week from --date using a JSON spec")
+    plan.add_argument('spec', help="JSON file with 'subjects' and 'availability'")
+    plan.add_argument('--dry-run', action='store_true', help="print the plan without saving it")
+    import_file = commands.add_parser(
+        'import', help="bulk import editor lines into --date, or .ics/.csv events into their dates")
+    import_file.add_argument('path')
+    export_file = commands.add_parser('export', help="export stored tasks to an .ics or .csv file")
+    export_file.add_argument('path')
+    export_file.add_argument('--start', help="first date to export (YYYY-MM-DD)")
+    export_file.add_argument('--end', help="last date to export (YYYY-MM-DD)")
+    daemon = commands.add_parser('daemon', help="serve requests on the Unix socket")
+    daemon.add_argument('--no-reminders', action='store_true',
+                        help="do not remind when tasks start and end")
+    serve = commands.add_parser('serve-http', help="serve many users' schedules over HTTP/JSON")
+    serve.add_argument('--host', default='127.0.0.1',
+                       help="address to listen on, default 127.0.0.1; there is no "
+                            "authentication, so only bind to addresses trusted users can reach")
+    serve.add_argument('--port', type=int, default=SERVER_DEFAULT_PORT)
+    serve.add_argument('--db', default=os.path.expanduser("~/.study_planner_shared.db"),
+                       help="shared SQLite database, default ~/.study_planner_shared.db")
+    args = parser.parse_args(argv)
+    
+    # The shared server has its own database and never forwards to a running planner
+    if args.cmd == 'serve-http':
+        serve_http(args.db, args.host, args.port)
+        return 0
+    
+    request = {'cmd': args.cmd, 'date': args.date}
+    if args.cmd == 'toggle':
+        request['index'] = args.index
+    elif args.cmd == 'stats':
+        request['weeks'] = args.weeks
+    elif args.cmd == 'reviews':
+        request['days'] = args.days
+    elif args.cmd == 'review':
+        request.update(subject=args.subject, quality=args.quality)
+    elif args.cmd in ('track', 'untrack'):
+        request['subject'] = args.subject
+    elif args.cmd == 'edit':
+        request['lines'] = sys.stdin.read().splitlines()
+        if args.every_weekday:
+            request['template'] = True
+    elif args.cmd == 'import':
+        request['path'] = os.path.abspath(args.path)
+    elif args.cmd == 'export':
+        request.update(path=os.path.abspath(args.path), start=args.start, end=args.end)
+    elif args.cmd == 'plan':
+        with open(args.spec, 'r') as f:
+            request['spec'] = json.load(f)
+        request['dry_run'] = args.dry_run
+    
+    # A running GUI or daemon owns the data, so let it answer
+    try:
+        instance_lock = InstanceLock()
+    except PermissionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not instance_lock.acquire():
+        if args.cmd == 'daemon':
+            print("Study Planner is already running!", file=sys.stderr)
+            return 1
+        try:
+            return print_reply(send_request(default_socket_path(), request))
+        except OSError as e:
+            print(f"Study Planner is running but not answering: {e}", file=sys.stderr)
+            return 1
+    
+    planner = HeadlessPlanner(background_writes=args.cmd == 'daemon')
+    try:
+        if args.cmd == 'daemon':
+            planner.serve(default_socket_path(), not args.no_reminders)
+            return 0
+        return print_reply(planner.execute(request))
+    finally:
+        planner.close()
+        instance_lock.release()
 
 def main():
     """Main function"""
+    if sys.argv[1:2] == ['--headless']:
+        sys.exit(headless_main(sys.argv[2:]))
+    
+    parser = argparse.ArgumentParser(description="Study Planner")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print a breakdown of startup phases after the first paint")
+    parser.add_argument('--toggle', type=int, metavar='INDEX',
+                        help="toggle one of today's tasks, in the running instance if there is one")
+    parser.add_argument('--server', metavar='URL',
+                        help="sync the shown day with a shared server started with serve-http")
+    parser.add_argument('--user', help="user name on the shared server, default the login name")
+    parser.add_argument('--no-reminders', action='store_true',
+                        help="do not remind when tasks start and end")
+    args = parser.parse_args()
+    request = {'cmd': 'toggle', 'index': args.toggle} if args.toggle is not None else None
+    
     print("Starting Study Planner...")
     print("Press Ctrl+C in terminal to exit")
     
-    planner = StudyPlanner()
+    planner = StudyPlanner(StartupProfiler() if args.profile_startup else None, request,
+                           args.server, args.user, not args.no_reminders)
     
     # Only run if planner was successfully created
     if hasattr(planner, 'root'):
         planner.run()
-    else:
-        print("Another instance is already running!")
 
 if __name__ == "__main__":
     main()
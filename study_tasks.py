@@ -0,0 +1,134 @@
+"""
+Study Planner task records
+Task records, duration and time range parsing and the editor line format,
+importable on their own by the planner, its tools and its tests.
+"""
+
+import re
+import sys
+
+DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([hm])")
+
+def parse_duration_minutes(duration):
+    """Convert free-text durations like '1.5h', '45m', '1h 30m' or '-' to minutes"""
+    total = 0.0
+    for amount, unit in DURATION_PART_RE.findall(duration or ""):
+        total += float(amount) * (60 if unit == 'h' else 1)
+    return int(round(total))
+
+def parse_time_range(time_text):
+    """Convert 'HH:MM-HH:MM' (or a single 'HH:MM') to start/end minutes after midnight"""
+    try:
+        start_text, _, end_text = (time_text or "").partition('-')
+        hours, minutes = start_text.strip().split(':')
+        start = int(hours) * 60 + int(minutes)
+        if not end_text.strip():
+            return start, start
+        hours, minutes = end_text.strip().split(':')
+        end = int(hours) * 60 + int(minutes)
+    except ValueError:
+        return None
+    # Ranges like 22:00-01:00 run past midnight
+    if end < start:
+        end += 24 * 60
+    return start, end
+
+class Task:
+    """Compact task record; text fields are interned so repeated subjects share memory"""
+    __slots__ = ('time', 'subject', 'duration', 'completed', 'minutes')
+    
+    def __init__(self, time, subject, duration, completed=False, minutes=None):
+        self.time = sys.intern(time)
+        self.subject = sys.intern(subject)
+        self.duration = sys.intern(duration)
+        self.completed = bool(completed)
+        self.minutes = parse_duration_minutes(duration) if minutes is None else minutes
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from the JSON/dict form used in schedule files"""
+        return cls(data['time'], data['subject'], data['duration'], data.get('completed', False))
+    
+    def to_dict(self):
+        """Return the JSON/dict form used in schedule files and socket replies"""
+        return {'time': self.time, 'subject': self.subject,
+                'duration': self.duration, 'completed': self.completed}
+    
+    def replace(self, **changes):
+        """Return a copy with some fields changed"""
+        task = Task(self.time, self.subject, self.duration, self.completed, self.minutes)
+        for name, value in changes.items():
+            setattr(task, name, value)
+        return task
+    
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return (self.time, self.subject, self.duration, self.completed) == \
+            (other.time, other.subject, other.duration, other.completed)
+    
+    def __repr__(self):
+        return f"Task({self.time!r}, {self.subject!r}, {self.duration!r}, {self.completed!r})"
+
+# Editor line format: "[✓] 06:00-10:00 | Subject | 1.5h"
+TASK_STATUS_DONE = {"[✓]", "[x]", "[X]"}
+TASK_STATUS_OPEN = {"[○]", "[ ]", "[]"}
+TASK_TIME_RE = re.compile(r"^\d{1,2}:\d{2}(\s*-\s*\d{1,2}:\d{2})?$")
+TASK_DURATION_RE = re.compile(r"^(-|\d+(\.\d+)?h|\d+m|\d+h\s*\d+m)$")
+
+class TaskLineError(ValueError):
+    """A line in the task editor format could not be parsed"""
+
+def format_task_line(task):
+    """Format a task as an editor line: [✓] time | subject | duration"""
+    status = "[✓]" if task.completed else "[○]"
+    return f"{status} {task.time} | {task.subject} | {task.duration}"
+
+def parse_task_line(line):
+    """Parse an editor line into a Task, None for blank lines"""
+    line = line.strip()
+    if not line:
+        return None
+    
+    parts = [part.strip() for part in line.split('|')]
+    if len(parts) < 2:
+        raise TaskLineError("expected '[✓] time | subject | duration'")
+    if len(parts) > 3:
+        raise TaskLineError("too many '|' separators")
+    
+    # The status marker and the time share the first field
+    if not parts[0].startswith('['):
+        raise TaskLineError("missing status marker like [✓] or [○]")
+    status_part, _, time_part = parts[0].partition(']')
+    status_part += ']'
+    time_part = time_part.strip()
+    if status_part not in TASK_STATUS_DONE and status_part not in TASK_STATUS_OPEN:
+        raise TaskLineError(f"unknown status {status_part}")
+    if not TASK_TIME_RE.match(time_part):
+        raise TaskLineError(f"bad time '{time_part}', expected HH:MM-HH:MM")
+    
+    subject = parts[1]
+    if not subject:
+        raise TaskLineError("empty subject")
+    
+    duration = parts[2] if len(parts) > 2 else "1h"
+    if not TASK_DURATION_RE.match(duration):
+        raise TaskLineError(f"bad duration '{duration}', expected e.g. 1.5h, 45m or -")
+    
+    return Task(time_part, subject, duration, status_part in TASK_STATUS_DONE)
+
+def iter_task_lines(lines, start=1):
+    """Parse lines lazily, yielding (line number, task, error) for non-blank lines"""
+    for lineno, line in enumerate(lines, start):
+        try:
+            task = parse_task_line(line)
+        except TaskLineError as e:
+            yield lineno, None, str(e)
+            continue
+        if task is not None:
+            yield lineno, task, None
+
+def iter_tasks_file(path):
+    """Stream (line number, task, error) from a task file without reading it whole"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_task_lines(f)
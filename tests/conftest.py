@@ -0,0 +1,20 @@
+"""Shared fixtures: the planner script loaded as a module"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def planner():
+    """plannerV1.8.py imported under a valid module name"""
+    spec = importlib.util.spec_from_file_location("study_planner",
+                                                  os.path.join(ROOT, "plannerV1.8.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
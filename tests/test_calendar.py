@@ -0,0 +1,93 @@
+"""iCalendar and CSV import/export"""
+
+from datetime import date, datetime
+
+import pytest
+
+ICS = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+DTSTART:20261019T090000\r
+DTEND:20261019T103000\r
+SUMMARY:Signals an\r
+ d Systems\\, lab\r
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4\r
+EXDATE:20261021T090000\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+DTSTART:20261020\r
+SUMMARY:Holiday\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+@pytest.fixture
+def store(planner, tmp_path):
+    store = planner.ScheduleStore(str(tmp_path / "planner.db"))
+    yield store
+    store.close()
+
+
+def test_weekly_byday_count_with_exdate_and_folded_summary(planner):
+    events = list(planner.iter_ical_events(ICS.splitlines(keepends=True)))
+    occurrences = [(day, task) for _, day, task, error in events if error is None]
+    # COUNT includes the excluded Wednesday
+    assert [day for day, _ in occurrences] == \
+        [date(2026, 10, 19), date(2026, 10, 26), date(2026, 10, 28)]
+    task = occurrences[0][1]
+    assert (task.time, task.subject, task.duration) == \
+        ("09:00-10:30", "Signals and Systems, lab", "1.5h")
+    errors = [(lineno, error) for lineno, _, _, error in events if error]
+    assert errors == [(11, "all-day event has no time range")]
+
+
+def test_until_ends_a_daily_rule(planner):
+    start = datetime(2026, 10, 19, 9)
+    days = [moment.day for moment in
+            planner.expand_recurrence(start, "FREQ=DAILY;INTERVAL=2;UNTIL=20261025", set())]
+    assert days == [19, 21, 23, 25]
+
+
+def test_merge_tasks_skips_time_and_subject_duplicates(planner, store):
+    day = date(2026, 3, 2)
+    task = planner.Task("09:00-10:00", "Circuits", "1h")
+    assert store.merge_tasks([(day, task)]) == (1, 0)
+    other = planner.Task("11:00-12:00", "Circuits", "1h")
+    assert store.merge_tasks([(day, task.replace(completed=True)), (day, other)]) == (1, 1)
+    assert store.tasks_on(day) == [task, other]
+
+
+def test_csv_lines_with_errors_are_reported(planner):
+    lines = ["date,time,subject,duration,completed\n",
+             "2026-03-02,09:00-10:00,Circuits,1h,yes\n",
+             "2026-03-02,9am,Circuits,1h,no\n",
+             "2026-03-32,09:00-10:00,Circuits,1h,no\n",
+             "2026-03-02,09:00-10:00,Circuits,soon,no\n"]
+    events = list(planner.iter_csv_events(lines))
+    assert events[0][1:3] == (date(2026, 3, 2), planner.Task("09:00-10:00", "Circuits", "1h", True))
+    assert [lineno for lineno, _, _, error in events if error] == [3, 4, 5]
+    assert "bad time" in events[1][3] and "bad duration" in events[3][3]
+
+
+def test_csv_export_import_round_trip(planner, tmp_path):
+    source = tmp_path / "in.csv"
+    source.write_text("date,time,subject,duration,completed\n"
+                      "2026-03-02,09:00-10:30,Circuits,1.5h,1\n"
+                      "2026-03-02,22:00-01:00,Night | Owl,3h,0\n"
+                      "2026-03-04,14:00-15:00,\"Tests, English\",1h,0\n", encoding="utf-8")
+    first = planner.ScheduleStore(str(tmp_path / "first.db"))
+    second = planner.ScheduleStore(str(tmp_path / "second.db"))
+    try:
+        events = [(day, task) for _, day, task, error in planner.iter_calendar_file(str(source))]
+        assert first.merge_tasks(events) == (3, 0)
+        exported = tmp_path / "out.csv"
+        assert planner.write_calendar_file(str(exported), first.tasks_between()) == 3
+        events = [(day, task) for _, day, task, error in planner.iter_calendar_file(str(exported))]
+        assert second.merge_tasks(events) == (3, 0)
+        for day in (date(2026, 3, 2), date(2026, 3, 4)):
+            assert second.tasks_on(day) == first.tasks_on(day)
+        assert first.tasks_on(date(2026, 3, 2))[1].subject == "Night / Owl"
+    finally:
+        first.close()
+        second.close()
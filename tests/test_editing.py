@@ -0,0 +1,49 @@
+"""Saving edited days and the weekday templates"""
+
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def core(planner, tmp_path):
+    core = planner.PlannerCore(home_dir=str(tmp_path), background_writes=False)
+    yield core
+    core.close()
+
+
+def weekday_subjects(core, day):
+    return [task.subject for task in core.schedule[day.strftime("%A")]]
+
+
+def test_editing_today_changes_the_template(planner, core):
+    today = date.today()
+    core.replace_tasks(today, [planner.Task("06:00-08:00", "Circuits", "2h")])
+    assert weekday_subjects(core, today) == ["Circuits"]
+
+
+def test_editing_a_later_date_only_changes_that_date(planner, core):
+    later = date.today() + timedelta(days=21)
+    before = weekday_subjects(core, later)
+    core.replace_tasks(later, [planner.Task("06:00-08:00", "Circuits", "2h")])
+    assert weekday_subjects(core, later) == before
+    assert [task.subject for task in core.store.tasks_on(later)] == ["Circuits"]
+    assert [task.subject for task in core.planned_tasks(later + timedelta(days=7))] == before
+
+
+def test_apply_to_every_weekday(planner, core):
+    later = date.today() + timedelta(days=21)
+    core.replace_tasks(later, [planner.Task("06:00-08:00", "Circuits", "2h")], as_template=True)
+    assert weekday_subjects(core, later) == ["Circuits"]
+    assert [task.subject for task in core.planned_tasks(later + timedelta(days=7))] == ["Circuits"]
+
+
+def test_planned_week_leaves_templates_alone(core):
+    today = date.today()
+    templates = {name: [task.subject for task in tasks] for name, tasks in core.schedule.items()}
+    spec = {'subjects': [{'name': "Signals", 'hours': 3}],
+            'availability': {today.strftime("%A"): ["06:00-10:00"]}}
+    plan, _ = core.plan_week(spec, today)
+    assert [task.subject for task in core.store.tasks_on(today)] == ["Signals"]
+    assert {name: [task.subject for task in tasks]
+            for name, tasks in core.schedule.items()} == templates
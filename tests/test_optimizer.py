@@ -0,0 +1,74 @@
+"""Week optimizer: deadlines, daily caps and unplaced minutes"""
+
+from datetime import date, timedelta
+
+MONDAY = date(2026, 10, 19)
+MORNINGS = {day: ["06:00-10:00"] for day in
+            ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")}
+
+
+def planned_minutes(plan, name, until=None):
+    """Minutes of a subject in a plan, optionally only up to a date"""
+    return sum(task.minutes for day, tasks in plan.items() for task in tasks
+               if task.subject == name and (until is None or day <= until))
+
+
+def test_deadline_subject_gets_its_hours_before_a_busier_subject(planner):
+    subjects = [planner.StudySubject("A", 3, priority=1, deadline=MONDAY),
+                planner.StudySubject("B", 10, priority=3)]
+    plan, unplaced = planner.optimize_week(subjects, MORNINGS, MONDAY)
+    assert planned_minutes(plan, "A", MONDAY) == 180
+    assert "A" not in unplaced
+    assert planned_minutes(plan, "B") == 600
+
+
+def test_shared_deadline_day_is_repaired_in_deadline_order(planner):
+    # Both fit on Monday only if neither takes more than its share
+    subjects = [planner.StudySubject("Exam", 2, priority=1, deadline=MONDAY),
+                planner.StudySubject("Essay", 2, priority=1, deadline=MONDAY),
+                planner.StudySubject("Reading", 20, priority=5)]
+    plan, unplaced = planner.optimize_week(subjects, MORNINGS, MONDAY)
+    assert planned_minutes(plan, "Exam", MONDAY) == 120
+    assert planned_minutes(plan, "Essay", MONDAY) == 120
+    assert "Exam" not in unplaced and "Essay" not in unplaced
+
+
+def test_infeasible_deadline_is_reported(planner):
+    subjects = [planner.StudySubject("A", 5, deadline=MONDAY)]
+    plan, unplaced = planner.optimize_week(subjects, MORNINGS, MONDAY)
+    # The daily cap allows 3h on the only day before the deadline
+    assert planned_minutes(plan, "A") == planner.PLAN_MAX_DAILY_MINUTES
+    assert unplaced == {"A": 300 - planner.PLAN_MAX_DAILY_MINUTES}
+
+
+def test_plan_respects_daily_cap_and_deadlines(planner):
+    deadline = MONDAY + timedelta(days=2)
+    subjects = [planner.StudySubject("A", 6, priority=2, deadline=deadline),
+                planner.StudySubject("B", 8, priority=1),
+                planner.StudySubject("C", 4, priority=3, deadline=MONDAY + timedelta(days=4))]
+    plan, unplaced = planner.optimize_week(subjects, MORNINGS, MONDAY)
+    assert not unplaced
+    assert planned_minutes(plan, "A", deadline) == 360
+    for day, tasks in plan.items():
+        for name in "ABC":
+            assert sum(task.minutes for task in tasks if task.subject == name) \
+                <= planner.PLAN_MAX_DAILY_MINUTES
+
+
+def test_no_availability_leaves_everything_unplaced(planner):
+    subjects = [planner.StudySubject("A", 1.5)]
+    plan, unplaced = planner.optimize_week(subjects, {}, MONDAY)
+    assert all(not tasks for tasks in plan.values())
+    assert unplaced == {"A": 90}
+
+
+def test_work_is_spread_over_the_week(planner):
+    long_days = {day: ["06:00-12:00", "13:00-18:00", "19:00-23:30"] for day in MORNINGS}
+    subjects = [planner.StudySubject("A", 5, priority=2),
+                planner.StudySubject("B", 4, priority=1),
+                planner.StudySubject("C", 3, priority=3)]
+    plan, unplaced = planner.optimize_week(subjects, long_days, MONDAY)
+    assert not unplaced
+    loads = [sum(task.minutes for task in tasks) for tasks in plan.values()]
+    assert sum(loads) == 720
+    assert max(loads) <= 120  # 12h over 7 days, rounded up to whole blocks
@@ -0,0 +1,15 @@
+"""Persistence worker: coalescing and draining on stop"""
+
+
+def test_worker_coalesces_records_of_a_day_and_drains_on_stop(planner):
+    batches = []
+    worker = planner.PersistenceWorker(batches.append, window=60)
+    worker.submit({'op': 'day', 'day': 'Monday', 'tasks': []})
+    worker.submit({'op': 'day', 'day': 'Tuesday', 'tasks': []})
+    worker.submit({'op': 'day', 'day': 'Monday', 'tasks': [{'subject': 'Circuits'}]})
+    assert worker.pending_writes == 2
+    worker.stop()
+    records = [record for batch in batches for record in batch]
+    assert [record['day'] for record in records] == ['Tuesday', 'Monday']
+    assert records[1]['tasks'] == [{'subject': 'Circuits'}]
+    assert worker.pending_writes == 0
@@ -0,0 +1,61 @@
+"""Reminder scheduler: generations across midnight"""
+
+from datetime import date, datetime
+
+import pytest
+
+
+@pytest.fixture
+def clock(planner, monkeypatch):
+    """Fake date.today() and datetime.now() inside the planner module"""
+    state = {'now': datetime(2026, 10, 19, 23, 30)}
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            now = state['now']
+            return cls(now.year, now.month, now.day)
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return state['now']
+
+    monkeypatch.setattr(planner, 'date', FakeDate)
+    monkeypatch.setattr(planner, 'datetime', FakeDatetime)
+    return state
+
+
+def test_reminder_past_midnight_survives_the_horizon_moving(planner, clock):
+    night = planner.Task("23:00-01:00", "Night Owl", "2h")
+    scheduler = planner.ReminderScheduler(lambda day: [night], lambda title, message: None,
+                                          horizon_days=1)
+    monday = date(2026, 10, 19)
+    scheduler.reschedule_day(monday)
+    assert scheduler.pending == 1  # Only the 01:00 end is still ahead
+
+    clock['now'] = datetime(2026, 10, 20, 0, 0, 30)
+    scheduler.extend_horizon()
+    assert monday in scheduler.generations
+    assert scheduler.pending == 3  # Monday's end, Tuesday's start and end
+    assert scheduler.stale == 0
+
+    scheduler.compact()
+    heads = sorted(scheduler.heap)
+    assert heads[0][2] == monday and heads[0][4] == 'end'
+    assert scheduler.pending == len(scheduler.heap) == 3
+
+
+def test_fired_past_day_is_forgotten_at_the_next_midnight(planner, clock):
+    night = planner.Task("23:00-01:00", "Night Owl", "2h")
+    scheduler = planner.ReminderScheduler(lambda day: [night], lambda title, message: None,
+                                          horizon_days=1)
+    monday = date(2026, 10, 19)
+    scheduler.reschedule_day(monday)
+    scheduler.day_events[monday] = 0  # As if its last reminder had fired
+    scheduler.heap.clear()
+
+    clock['now'] = datetime(2026, 10, 20, 0, 0, 30)
+    scheduler.extend_horizon()
+    assert monday not in scheduler.generations
+    assert scheduler.stale == 0
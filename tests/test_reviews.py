@@ -0,0 +1,125 @@
+"""Spaced repetition: SM-2 steps, review state in the store and review tasks"""
+
+from datetime import date, timedelta
+
+import pytest
+
+MONDAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+def store(planner, tmp_path):
+    store = planner.ScheduleStore(str(tmp_path / "planner.db"))
+    yield store
+    store.close()
+
+
+def review_state(store, subject):
+    row = store.conn.execute(
+        "SELECT repetitions, interval, easiness, due, last_review FROM review_items "
+        "WHERE subject = ?", (subject,)).fetchone()
+    return tuple(row) if row is not None else None
+
+
+def test_sm2_intervals_grow_with_good_reviews(planner):
+    assert planner.sm2_step(0, 0, 2.5, 4) == (1, 1, 2.5)
+    assert planner.sm2_step(1, 1, 2.5, 4) == (2, 6, 2.5)
+    repetitions, interval, easiness = planner.sm2_step(2, 6, 2.5, 5)
+    assert (repetitions, interval) == (3, 15)
+    assert easiness == pytest.approx(2.6)
+
+
+def test_sm2_poor_review_starts_over_and_easiness_has_a_floor(planner):
+    repetitions, interval, easiness = planner.sm2_step(3, 15, 2.6, 2)
+    assert (repetitions, interval) == (0, 1)
+    assert easiness == pytest.approx(2.28)
+    assert planner.sm2_step(0, 1, 1.3, 0)[2] == pytest.approx(1.3)
+
+
+def test_apply_review_counts_once_per_day(store):
+    key = MONDAY.isoformat()
+    with store.lock, store.conn:
+        assert store.apply_review("Circuits", key, 4, 0) == ("2026-10-20", 1)
+        assert store.apply_review("Circuits", key, 4, 1) is None
+        due, interval = store.apply_review("Circuits", "2026-10-20", 4, 0)
+    assert (due, interval) == ("2026-10-26", 6)
+    assert review_state(store, "Circuits")[:2] == (2, 6)
+
+
+def test_undo_review_restores_the_previous_state(store):
+    with store.lock, store.conn:
+        store.apply_review("Circuits", "2026-10-19", 4, 0)
+        before = review_state(store, "Circuits")
+        store.apply_review("Circuits", "2026-10-20", 4, 2)
+        store.undo_review("Circuits", "2026-10-20", 2)
+    assert review_state(store, "Circuits") == before
+    with store.lock, store.conn:
+        store.undo_review("Circuits", "2026-10-19", 0)
+    assert review_state(store, "Circuits") is None
+
+
+def test_undo_review_leaves_a_later_review_alone(store):
+    with store.lock, store.conn:
+        store.apply_review("Circuits", "2026-10-19", 4, 0)
+        store.apply_review("Circuits", "2026-10-20", 4, 0)
+        after = review_state(store, "Circuits")
+        store.undo_review("Circuits", "2026-10-19", 0)
+    assert review_state(store, "Circuits") == after
+
+
+def test_completing_non_study_tasks_records_no_review(planner, store):
+    store.ensure_day(MONDAY, [planner.Task("06:00-10:00", "Circuits", "2h"),
+                              planner.Task("14:00-18:00", "Rest", "-"),
+                              planner.Task("19:00-20:00", "Planning", "1h")])
+    store.set_tracked("Planning", False)
+    for position in range(3):
+        store.set_completed(MONDAY, position, True)
+    assert [row[0] for row in store.due_reviews(MONDAY + timedelta(days=30))] == ["Circuits"]
+    store.set_completed(MONDAY, 0, False)
+    assert store.due_reviews(MONDAY + timedelta(days=30)) == []
+
+
+def test_untracked_subjects_are_stored_and_can_be_turned_back_on(planner, store, tmp_path):
+    store.ensure_day(MONDAY, [planner.Task("19:00-20:00", "Planning", "1h")])
+    store.set_completed(MONDAY, 0, True)
+    store.set_tracked("Planning", False)
+    assert store.due_reviews(MONDAY + timedelta(days=30)) == []
+    store.close()
+
+    reopened = planner.ScheduleStore(str(tmp_path / "planner.db"))
+    try:
+        assert not reopened.tracks("Review: Planning", 60)
+        reopened.set_tracked("Planning", True)
+        reopened.set_completed(MONDAY, 0, False)
+        reopened.set_completed(MONDAY, 0, True)
+        assert [row[0] for row in reopened.due_reviews(MONDAY + timedelta(days=30))] == ["Planning"]
+    finally:
+        reopened.close()
+
+
+def test_startup_materializes_today_with_due_reviews(planner, tmp_path):
+    store = planner.ScheduleStore(str(tmp_path / ".study_planner.db"))
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    with store.lock, store.conn:
+        store.apply_review("Signals", yesterday, 4)
+    store.close()
+
+    core = planner.PlannerCore(home_dir=str(tmp_path), background_writes=False)
+    try:
+        subjects = [task.subject for task in core.store.tasks_on(date.today())]
+        assert planner.REVIEW_PREFIX + "Signals" in subjects
+    finally:
+        core.close()
+
+
+def test_saved_review_tasks_stay_out_of_the_weekday_template(planner, tmp_path):
+    core = planner.PlannerCore(home_dir=str(tmp_path), background_writes=False)
+    try:
+        today = date.today()
+        review = planner.Task("20:00-20:30", planner.REVIEW_PREFIX + "Signals", "30m")
+        core.replace_tasks(today, [planner.Task("06:00-10:00", "Circuits", "2h"), review])
+        template = core.schedule[today.strftime("%A")]
+        assert [task.subject for task in template] == ["Circuits"]
+        assert review in core.store.tasks_on(today)
+    finally:
+        core.close()
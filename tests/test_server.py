@@ -0,0 +1,86 @@
+"""Shared server: stored and never-stored days, and what sync does with them"""
+
+import json
+from datetime import date
+
+import pytest
+
+DAY = date(2026, 3, 2)
+PATH = "/users/alice/days/2026-03-02"
+TASK = {'time': "09:00-10:00", 'subject': "Circuits", 'duration': "1h", 'completed': False}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "shared.db")
+
+
+def api_for(planner, db_path):
+    return planner.ScheduleAPI(planner.SharedScheduleStore(db_path))
+
+
+def test_cleared_day_stays_stored_with_a_cold_cache(planner, db_path):
+    api = api_for(planner, db_path)
+    assert api.handle('PUT', PATH, {}, json.dumps({'tasks': [TASK]}))[0] == 200
+    assert api.handle('PUT', PATH, {}, json.dumps({'tasks': []}))[0] == 200
+    status, _, payload = api.handle('GET', PATH, {}, b'')
+    assert (status, payload['tasks']) == (200, [])
+    api.store.close()
+
+    cold = api_for(planner, db_path)
+    try:
+        status, headers, payload = cold.handle('GET', PATH, {}, b'')
+        assert (status, payload['tasks']) == (200, [])
+        assert cold.handle('GET', PATH, {'If-None-Match': headers['ETag']}, b'')[0] == 304
+        assert cold.handle('GET', "/users/alice/days/2026-03-03", {}, b'')[0] == 404
+    finally:
+        cold.store.close()
+
+
+class FakeClient:
+    base_url = "http://127.0.0.1:8765"
+
+    def __init__(self, sync_holder, answer):
+        self.sync_holder = sync_holder
+        self.answer = answer
+        self.pushed = []
+
+    def fetch_day(self, day):
+        if self.answer is KeyError:
+            raise KeyError(day)
+        return self.answer
+
+    def push_day(self, day, tasks):
+        self.pushed.append((day, tasks))
+        self.sync_holder[0].stop()
+
+
+def run_once(planner, answer):
+    """Run one sync round for DAY with local tasks, return (client, remote changes)"""
+    holder, changes = [], []
+
+    def on_remote_change(day, tasks):
+        changes.append((day, tasks))
+        holder[0].stop()
+
+    client = FakeClient(holder, answer)
+    sync = planner.ServerSync(client, on_remote_change, interval=0.05)
+    holder.append(sync)
+    sync.watch(DAY, [TASK])
+    sync.start()
+    sync.join(2)
+    sync.stop()
+    sync.join(2)
+    return client, changes
+
+
+def test_sync_applies_a_day_cleared_on_the_server(planner):
+    client, changes = run_once(planner, [])
+    assert changes == [(DAY, [])]
+    assert client.pushed == []
+
+
+def test_sync_seeds_only_a_day_the_server_never_stored(planner):
+    client, changes = run_once(planner, KeyError)
+    assert client.pushed == [(DAY, [TASK])]
+    assert changes == []
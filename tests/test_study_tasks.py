@@ -0,0 +1,61 @@
+"""Editor line format, durations and time ranges"""
+
+import pytest
+
+from study_tasks import (Task, TaskLineError, format_task_line, iter_task_lines,
+                         parse_duration_minutes, parse_task_line, parse_time_range)
+
+
+def test_parse_task_line_reads_status_time_subject_and_duration():
+    task = parse_task_line("[✓] 06:00-10:00 | Electronics 2 | 1.5h")
+    assert (task.time, task.subject, task.duration, task.completed, task.minutes) == \
+        ("06:00-10:00", "Electronics 2", "1.5h", True, 90)
+    assert not parse_task_line("[ ] 14:00-18:00 | Rest | -").completed
+
+
+def test_parse_task_line_defaults_duration_and_skips_blank_lines():
+    assert parse_task_line("[○] 07:00 | Reading").duration == "1h"
+    assert parse_task_line("   ") is None
+
+
+def test_format_and_parse_round_trip():
+    task = Task("19:00-23:00", "Tests + English", "1h 30m", True)
+    assert parse_task_line(format_task_line(task)) == task
+
+
+@pytest.mark.parametrize("line, message", [
+    ("[✓] 06:00-10:00", "expected"),
+    ("[✓] 06:00 | A | 1h | extra", "too many"),
+    ("06:00 | A | 1h", "missing status"),
+    ("[?] 06:00 | A | 1h", "unknown status"),
+    ("[✓] 6am | A | 1h", "bad time"),
+    ("[✓] 06:00 |  | 1h", "empty subject"),
+    ("[✓] 06:00 | A | soon", "bad duration"),
+])
+def test_parse_task_line_errors(line, message):
+    with pytest.raises(TaskLineError, match=message):
+        parse_task_line(line)
+
+
+def test_parse_duration_minutes():
+    assert parse_duration_minutes("1.5h") == 90
+    assert parse_duration_minutes("45m") == 45
+    assert parse_duration_minutes("1h 30m") == 90
+    assert parse_duration_minutes("-") == 0
+    assert parse_duration_minutes(None) == 0
+
+
+def test_parse_time_range():
+    assert parse_time_range("06:00-10:00") == (360, 600)
+    assert parse_time_range("07:30") == (450, 450)
+    assert parse_time_range("23:00-01:00") == (23 * 60, 25 * 60)
+    assert parse_time_range("soon") is None
+
+
+def test_iter_task_lines_numbers_lines_and_skips_blanks():
+    lines = ["[✓] 06:00-10:00 | A | 2h", "", "bad line", "[○] 14:00 | B | 30m"]
+    results = list(iter_task_lines(lines, start=10))
+    assert [lineno for lineno, _, _ in results] == [10, 12, 13]
+    assert results[0][1].subject == "A" and results[0][2] is None
+    assert results[1][1] is None and "expected" in results[1][2]
+    assert results[2][1].minutes == 30
@@ -0,0 +1,28 @@
+"""Startup view cache written on close"""
+
+import os
+from datetime import date, timedelta
+
+
+def test_close_caches_today(planner, tmp_path):
+    core = planner.PlannerCore(home_dir=str(tmp_path), background_writes=False)
+    core.close()
+    cache = core.read_view_cache()
+    assert cache is not None and cache['date'] == date.today().isoformat()
+    template = planner.DEFAULT_SCHEDULE[date.today().strftime("%A")]
+    assert [entry[1] for entry in cache['today']] == [task['subject'] for task in template]
+
+
+def test_no_cache_for_a_day_that_was_never_stored(planner, tmp_path, monkeypatch):
+    core = planner.PlannerCore(home_dir=str(tmp_path), background_writes=False)
+    tomorrow = date.today() + timedelta(days=1)
+
+    class NextDay(date):
+        @classmethod
+        def today(cls):
+            return cls(tomorrow.year, tomorrow.month, tomorrow.day)
+
+    # The planner stays open across midnight
+    monkeypatch.setattr(planner, 'date', NextDay)
+    core.close()
+    assert not os.path.exists(core.view_cache_file)